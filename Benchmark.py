@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+
+# Microbenchmarks of the hot paths of the modules Position, Block, Board and
+# Game, on reproducible workloads.
+# - Each benchmark is run on a board of each of several dimensions, with a
+#   given fraction of its cells filled at random, or once if it does not depend
+#   on a board. All random choices derive from the seed and from the name and
+#   parameters of the benchmark, so that the same workloads are measured from
+#   one run to the next.
+# - A workload is a list of operations, e.g. (block, position) pairs to test
+#   with can_be_dropped_at. Its operations are timed together, with as many
+#   loops as needed to take a measurable time, and that is repeated several
+#   times. The minimum and median time per operation are reported.
+# - Results are stored as JSON, keyed by the name of the benchmark and its
+#   parameters, and can be compared against a baseline stored earlier.
+
+import Block
+import Board
+import Game
+import Position
+
+import json
+import platform
+import random
+import statistics
+import time
+import timeit
+
+dimensions = (5, 10, 20)
+densities  = (0.2, 0.5)
+
+
+def make_random_board(dimension, density, generator):
+    """
+        Return a board of the given dimension, of which each cell is filled with
+        the given probability, using the given random generator.
+        - Full rows and columns are cleared, as they would be in a game.
+    """
+    board = Board.make_board(dimension, {
+        (x, y) for x in range(1, dimension + 1) for y in range(1, dimension + 1)
+        if generator.random() < density})
+    Board.clear_full_rows_and_columns(board)
+    return board
+
+
+def _get_blocks_and_positions(board, generator, nb_operations):
+    dimension = Board.dimension(board)
+    return [(generator.choice(Game.normalized_standard_blocks),
+             (generator.randint(1, dimension), generator.randint(1, dimension)))
+            for _ in range(nb_operations)]
+
+
+def _can_be_dropped_at(board, generator):
+    moves = _get_blocks_and_positions(board, generator, 500)
+
+    def run():
+        for block, position in moves:
+            Board.can_be_dropped_at(board, block, position)
+    return run, len(moves)
+
+
+def _get_droppable_positions(board, generator):
+    blocks = Game.normalized_standard_blocks
+
+    def run():
+        for block in blocks:
+            Board.get_droppable_positions(board, block)
+    return run, len(blocks)
+
+
+def _drop_and_clear(board, generator):
+    # Each operation copies the board, drops a block at one of the positions
+    # where it can be dropped, and clears full rows and columns.
+    moves = []
+    for block in Game.normalized_standard_blocks:
+        positions = Board.get_droppable_positions(board, block)
+        if len(positions) > 0:
+            moves.append((block, generator.choice(positions)))
+
+    def run():
+        for block, position in moves:
+            board_copy = Board.copy_board(board)
+            Board.drop_at(board_copy, block, position)
+            Board.clear_full_rows_and_columns(board_copy)
+    return run, max(len(moves), 1)
+
+
+def _are_chainable(board, generator):
+    # Pairs of free cells, or of filled cells, chosen at random.
+    dimension = Board.dimension(board)
+    cells = [(x, y) for x in range(1, dimension + 1) for y in range(1, dimension + 1)]
+    pairs = []
+    for _ in range(20):
+        first = generator.choice(cells)
+        state = Board.is_filled_at(board, first)
+        same = [cell for cell in cells if Board.is_filled_at(board, cell) == state]
+        pairs.append((first, generator.choice(same)))
+
+    def run():
+        for pair in pairs:
+            Board.are_chainable(board, pair)
+    return run, len(pairs)
+
+
+def _are_chained(board, generator):
+    # Collections of positions within the board, half of them grown as chains.
+    dimension = Board.dimension(board)
+    collections = []
+    for number in range(50):
+        positions = {(generator.randint(1, dimension), generator.randint(1, dimension))}
+        for _ in range(dimension):
+            if number % 2 == 0:
+                x, y = generator.choice(sorted(positions))
+                dx, dy = generator.choice(((1, 0), (-1, 0), (0, 1), (0, -1)))
+                if 1 <= x + dx <= dimension and 1 <= y + dy <= dimension:
+                    positions.add((x + dx, y + dy))
+            else:
+                positions.add((generator.randint(1, dimension), generator.randint(1, dimension)))
+        collections.append(positions)
+
+    def run():
+        for positions in collections:
+            Position.are_chained(positions)
+    return run, len(collections)
+
+
+def _are_equivalent(generator):
+    pairs = [(generator.choice(Block.standard_blocks), generator.choice(Block.standard_blocks))
+             for _ in range(200)]
+    pairs += [(block, Block.normalize(block)) for block in Block.standard_blocks]
+
+    def run():
+        for block, other_block in pairs:
+            Block.are_equivalent(block, other_block)
+    return run, len(pairs)
+
+
+def _highest_score(board, generator, nb_blocks):
+    blocks = [generator.choice(Game.normalized_standard_blocks) for _ in range(nb_blocks)]
+
+    def run():
+        Game.highest_score(board, blocks)
+    return run, 1
+
+
+def _play_greedy(dimension, generator):
+    blocks = [generator.choice(Block.standard_blocks) for _ in range(30)]
+
+    def run():
+        Game.play_greedy(Board.make_board(dimension), blocks)
+    return run, 1
+
+
+def get_benchmarks(quick=False):
+    """
+        Return a list of the benchmarks to run, each a tuple of its name, its
+        parameters and a function that returns the function to time and its
+        number of operations, when called with a random generator.
+        - Quick benchmarks only cover the smallest dimensions.
+    """
+    board_dimensions = dimensions[:2] if quick else dimensions
+    benchmarks = []
+    for dimension in board_dimensions:
+        for density in densities:
+            parameters = {"dimension": dimension, "density": density}
+
+            def with_board(workload, dimension=dimension, density=density):
+                return lambda generator: workload(
+                    make_random_board(dimension, density, generator), generator)
+            benchmarks += [
+                ("can_be_dropped_at", parameters, with_board(_can_be_dropped_at)),
+                ("get_droppable_positions", parameters, with_board(_get_droppable_positions)),
+                ("drop_at+clear_full_rows_and_columns", parameters, with_board(_drop_and_clear)),
+                ("are_chainable", parameters, with_board(_are_chainable)),
+            ]
+        benchmarks.append(("are_chained", {"dimension": dimension},
+                           lambda generator, dimension=dimension: _are_chained(
+                               Board.make_board(dimension), generator)))
+    benchmarks.append(("are_equivalent", {}, _are_equivalent))
+    for dimension, nb_blocks in ((5, 2), (6, 3)) if quick else ((5, 2), (6, 3), (8, 2)):
+        benchmarks.append(("highest_score", {"dimension": dimension, "blocks": nb_blocks},
+                           lambda generator, dimension=dimension, nb_blocks=nb_blocks:
+                           _highest_score(make_random_board(dimension, 0.3, generator),
+                                          generator, nb_blocks)))
+    benchmarks.append(("play_greedy", {"dimension": 6},
+                       lambda generator: _play_greedy(6, generator)))
+    return benchmarks
+
+
+def get_key(name, parameters):
+    """
+        Return the key of the results of the benchmark with the given name and
+        parameters.
+    """
+    return " ".join([name] + ["{}={}".format(parameter, value)
+                              for parameter, value in sorted(parameters.items())])
+
+
+def run_benchmarks(benchmarks, seed=0, repeat=5, min_time=0.2, report=None):
+    """
+        Run the given benchmarks, and return a dictionary mapping the key of
+        each benchmark to its results: the number of operations in its workload,
+        and the minimum and median time per operation in microseconds.
+        - The workload of each benchmark is made with a random generator seeded
+          with the given seed and with the key of the benchmark.
+        - Each workload is timed the given number of times, with as many loops
+          as needed to take at least the given time in seconds.
+        - If a report function is given, it is called with the key and results
+          of each benchmark as soon as it has run.
+    """
+    results = {}
+    for name, parameters, make_workload in benchmarks:
+        key = get_key(name, parameters)
+        function, nb_operations = make_workload(random.Random("{}:{}".format(seed, key)))
+        timer = timeit.Timer(function)
+        number = 1
+        while True:
+            if timer.timeit(number) >= min_time:
+                break
+            number *= 2
+        times = [elapsed / number / nb_operations * 1e6
+                 for elapsed in timer.repeat(repeat, number)]
+        results[key] = {"operations": nb_operations,
+                        "min_us": min(times),
+                        "median_us": statistics.median(times)}
+        if report is not None:
+            report(key, results[key])
+    return results
+
+
+def write_results(path, results, seed):
+    with open(path, "w") as file:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+            "results": results,
+        }, file, indent=2, sort_keys=True)
+
+
+def read_results(path):
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def compare_results(results, baseline, threshold=0.1):
+    """
+        Return a list of tuples of the key, the baseline time, the new time and
+        their ratio of each benchmark in both the given results and baseline,
+        comparing minimum times per operation, together with the list of keys of
+        the benchmarks that are slower than the baseline by more than the given
+        fraction.
+    """
+    comparison, regressions = [], []
+    for key in sorted(results.keys() & baseline.keys()):
+        before, after = baseline[key]["min_us"], results[key]["min_us"]
+        ratio = after / before if before > 0 else float("inf")
+        comparison.append((key, before, after, ratio))
+        if ratio > 1 + threshold:
+            regressions.append(key)
+    return comparison, regressions
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(description="Run the microbenchmarks.")
+    parser.add_argument("-o", "--output", help="write the results in JSON to this file")
+    parser.add_argument("-b", "--baseline", help="compare against the results in this file")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1,
+                        help="slowdown beyond which a benchmark is a regression (default: 0.1)")
+    parser.add_argument("-k", "--filter", default="",
+                        help="only run benchmarks whose key contains this text")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="only small dimensions")
+    args = parser.parse_args()
+
+    benchmarks = [benchmark for benchmark in get_benchmarks(args.quick)
+                  if args.filter in get_key(benchmark[0], benchmark[1])]
+    results = run_benchmarks(
+        benchmarks, args.seed, args.repeat,
+        report=lambda key, result: print("{:<60}{:>12.2f} us/op".format(key, result["min_us"]),
+                                         flush=True))
+    if args.output:
+        write_results(args.output, results, args.seed)
+    if args.baseline:
+        comparison, regressions = compare_results(results, read_results(args.baseline),
+                                                  args.threshold)
+        print()
+        print("{:<60}{:>12}{:>12}{:>8}".format("Benchmark", "baseline", "now", "ratio"))
+        for key, before, after, ratio in comparison:
+            print("{:<60}{:>12.2f}{:>12.2f}{:>8.2f}{}".format(
+                key, before, after, ratio, "  SLOWER" if key in regressions else ""))
+        if regressions:
+            print()
+            print(len(regressions), "benchmark(s) slower than the baseline by more than",
+                  "{:.0%}".format(args.threshold))
+            sys.exit(1)
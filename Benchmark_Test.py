@@ -0,0 +1,55 @@
+import Benchmark
+import Board
+import random
+import traceback
+
+
+# tests for benchmarks
+
+def test_Benchmarks__Reproducible_Workloads(score, max_score):
+    """Function get_benchmarks: workloads only depend on the seed."""
+    max_score.value += 2
+    try:
+        board = Benchmark.make_random_board(10, 0.5, random.Random("1:board"))
+        other_board = Benchmark.make_random_board(10, 0.5, random.Random("1:board"))
+        assert Board.get_all_filled_positions(board) == Board.get_all_filled_positions(other_board)
+        assert len(Board.get_all_filled_rows(board)) == len(Board.get_all_filled_columns(board)) == 0
+        keys = [Benchmark.get_key(name, parameters)
+                for name, parameters, _ in Benchmark.get_benchmarks(quick=True)]
+        assert len(set(keys)) == len(keys)
+        assert "can_be_dropped_at density=0.5 dimension=10" in keys
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_Benchmarks__Run_And_Compare(score, max_score):
+    """Functions run_benchmarks and compare_results: results and regressions."""
+    max_score.value += 3
+    try:
+        benchmarks = [benchmark for benchmark in Benchmark.get_benchmarks(quick=True)
+                      if benchmark[0] in ("are_equivalent", "can_be_dropped_at")][:2]
+        reported = []
+        results = Benchmark.run_benchmarks(benchmarks, repeat=2, min_time=0.001,
+                                           report=lambda key, result: reported.append(key))
+        assert reported == list(results) == \
+               [Benchmark.get_key(name, parameters) for name, parameters, _ in benchmarks]
+        for result in results.values():
+            assert result["operations"] > 0
+            assert 0 < result["min_us"] <= result["median_us"]
+        baseline = {"a": {"min_us": 1.0}, "b": {"min_us": 2.0}, "c": {"min_us": 1.0}}
+        new = {"a": {"min_us": 1.05}, "b": {"min_us": 3.0}, "d": {"min_us": 1.0}}
+        comparison, regressions = Benchmark.compare_results(new, baseline, 0.1)
+        assert [key for key, _, _, _ in comparison] == ["a", "b"]
+        assert comparison[1] == ("b", 2.0, 3.0, 1.5)
+        assert regressions == ["b"]
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+benchmark_test_functions = \
+    {
+        test_Benchmarks__Reproducible_Workloads,
+        test_Benchmarks__Run_And_Compare,
+    }
@@ -1,5 +1,13 @@
 import Position
 
+import array
+import os
+import sys
+
+# Modules that are only needed by block sources (hashlib, itertools, random)
+# are imported when the first source is made, so that importing this module
+# stays cheap for the GUI.
+
 
 class _Block:
 
@@ -14,6 +22,8 @@ class _Block:
         block.dots    = {(dot[0] - anchor[0], dot[1] - anchor[1]) for dot in self.dots}
         block.topleft = (self.topleft[0] - anchor[0], self.topleft[1] - anchor[1])
         block.size    = self.size
+        block.footprints = {}
+        block.offsets = {}
         return block
 
     def get_topleft_on_anchor(self):
@@ -21,6 +31,8 @@ class _Block:
         block.dots    = {(dot[0] - self.topleft[0], dot[1] - self.topleft[1]) for dot in self.dots}
         block.topleft = (0,0)
         block.size    = self.size
+        block.footprints = {}
+        block.offsets = {}
         return block
 
     def recalculate_boundaries(self):
@@ -38,6 +50,8 @@ class _Block:
                 max_y = pos[1]
         self.topleft = (min_x, min_y)
         self.size    = (max_x - min_x, max_y - min_y)
+        self.footprints = {}
+        self.offsets = {}
 
 
 
@@ -154,6 +168,50 @@ def get_vertical_offsets_from_anchor(block):
 
 
 
+def get_dot_offsets(block, dimension):
+    """
+        Return a tuple of the cell index offsets of the dots of the given block
+        on a board with the given dimension.
+        - Adding an offset to the cell index of the anchor yields the cell index
+          of the corresponding dot. The offsets are in ascending order.
+        - The offsets are computed once per dimension and cached on the block.
+        ASSUMPTIONS
+        - The given block is a proper block.
+        - The given dimension is a positive integer number.
+    """
+    offsets = block.offsets.get(dimension)
+    if offsets is None:
+        stride = dimension + 1
+        offsets = block.offsets[dimension] = tuple(sorted(x + y * stride for x, y in block.dots))
+    return offsets
+
+
+
+def get_anchor_footprints(block, dimension):
+    """
+        Return a tuple of all anchor positions at which the given block fits within
+        the boundaries of a board with the given dimension, each paired with the
+        frozen set of cell indices covered by the block at that anchor.
+        - The pairs are in ascending order of their anchor position.
+        - The footprints are computed once per dimension and cached on the block.
+        ASSUMPTIONS
+        - The given block is a proper block.
+        - The given dimension is a positive integer number.
+    """
+    footprints = block.footprints.get(dimension)
+    if footprints is None:
+        stride  = dimension + 1
+        offsets = get_dot_offsets(block, dimension)
+        footprints = tuple(
+            ((x, y), frozenset(x + y * stride + offset for offset in offsets))
+            for x in range(1 - block.topleft[0], dimension - block.topleft[0] - block.size[0] + 1)
+            for y in range(1 - block.topleft[1], dimension - block.topleft[1] - block.size[1] + 1)
+        )
+        block.footprints[dimension] = footprints
+    return footprints
+
+
+
 def are_equivalent(block, other_block):
     """
        Check whether the given blocks are equivalent, i.e. cover equivalent
@@ -196,10 +254,9 @@ def normalize(block):
 
 
 
-def print_block(block):
+def render_block(block):
     """
-        Print the given block on the standard output stream.
-        - The anchor of the given block will be revealed in the print-out.
+        Return the print-out of the given block, as printed by print_block.
         ASSUMPTIONS
         - The given block is a proper block.
     """
@@ -218,10 +275,19 @@ def print_block(block):
     else:
         anchor_symbol = "\u25A2"
     printout[-min(vertical_offsets[0], 0)][-min(horizontal_offsets[0], 0)] = anchor_symbol
-    for row in range(len(printout) - 1, -1, -1):
-        for col in range(0, len(printout[0])):
-            print(printout[row][col], end=" ")
-        print()
+    return "".join(" ".join(printout[row]) + " \n"
+                   for row in range(len(printout) - 1, -1, -1))
+
+
+def print_block(block):
+    """
+        Print the given block on the standard output stream.
+        - The anchor of the given block will be revealed in the print-out.
+        - The print-out is written at once.
+        ASSUMPTIONS
+        - The given block is a proper block.
+    """
+    sys.stdout.write(render_block(block))
 
 
 # collection of standard blocks used to play the game.
@@ -263,10 +329,106 @@ standard_blocks = \
     )
 
 
-def select_standard_block():
+class _BlockSource:
+
+    def __init__(self, seed, stream, weights, chunk_size):
+        import hashlib
+        import itertools
+        import random
+        if seed is None:
+            self.random = random.Random()
+        else:
+            digest = hashlib.sha256("{}:{}".format(seed, stream).encode()).digest()
+            self.random = random.Random(int.from_bytes(digest, "big"))
+        self.cum_weights = None if weights is None else tuple(itertools.accumulate(weights))
+        self.chunk_size = chunk_size
+        self.buffer = array.array("B")
+        self.next = 0
+
+    def fill(self, count):
+        self.buffer = self.buffer[self.next:]
+        self.next = 0
+        count = max(count, self.chunk_size)
+        self.buffer.extend(self.random.choices(
+            range(len(standard_blocks)), cum_weights=self.cum_weights, k=count))
+
+
+
+def make_block_source(seed=None, stream=0, weights=None, chunk_size=4096):
+    """
+        Return a new source of indices of standard blocks.
+        - Indices are drawn at random from a generator seeded with the given seed
+          and stream number. Sources with the same seed and stream yield the same
+          sequence of indices, in every process. Sources with the same seed but a
+          different stream, e.g. one per worker process, yield independent sequences.
+        - If the given seed is None, the source is seeded from the operating system.
+        - If weights are given, the index i is drawn with a probability proportional
+          to weights[i]. Otherwise all standard blocks are equally likely.
+        - Indices are drawn in chunks of the given size and handed out from there.
+        ASSUMPTIONS
+        - The given weights are None or a sequence of non-negative numbers with
+          the same length as standard_blocks and a positive sum.
+    """
+    return _BlockSource(seed, stream, weights, chunk_size)
+
+
+
+def draw_block_index(source):
+    """
+        Return the next index in standard_blocks drawn from the given block source.
+        ASSUMPTIONS
+        - The given source is made by make_block_source.
+    """
+    if source.next == len(source.buffer):
+        source.fill(1)
+    index = source.buffer[source.next]
+    source.next += 1
+    return index
+
+
+
+def draw_block_indices(source, count):
+    """
+        Return an array of the next given number of indices in standard_blocks
+        drawn from the given block source.
+        - The result is an array.array of unsigned bytes. The indices are the same
+          as those returned by as many successive calls of draw_block_index.
+        ASSUMPTIONS
+        - The given source is made by make_block_source.
+        - The given count is a non-negative integer number.
+    """
+    if source.next + count > len(source.buffer):
+        source.fill(count)
+    indices = source.buffer[source.next:source.next + count]
+    source.next += count
+    return indices
+
+
+
+_default_source = None
+
+
+def _forget_default_source():
+    # A forked child process would otherwise draw the same blocks as its parent
+    # and its siblings, from the copied generator and buffer.
+    global _default_source
+    _default_source = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_default_source)
+
+
+def select_standard_block(source=None):
     """
         Return one of the standard blocks.
-        - The resulting block is selected randomly.
+        - The resulting block is selected randomly from the given block source,
+          or from a source seeded by the operating system if no source is given.
+          That source is seeded anew in each forked child process.
     """
-    import random
-    return random.choice(standard_blocks)
+    global _default_source
+    if source is None:
+        if _default_source is None:
+            _default_source = make_block_source()
+        source = _default_source
+    return standard_blocks[draw_block_index(source)]
@@ -1,4 +1,5 @@
 import Block
+import Position
 import traceback
 
 
@@ -322,6 +323,94 @@ def test_Normalize__Standard_Blocks(score, max_score):
     except:
         print(traceback.format_exc())
 
+# Tests for get_anchor_footprints
+
+def test_Get_Anchor_Footprints__Single_Case(score, max_score):
+    """Function get_anchor_footprints: footprints of a block on a small board."""
+    max_score.value += 2
+    try:
+        block = Block.make_block({(0, 0), (1, 0), (1, 1)})
+        footprints = Block.get_anchor_footprints(block, 3)
+        assert [position for position, _ in footprints] == [(1, 1), (1, 2), (2, 1), (2, 2)]
+        for position, footprint in footprints:
+            assert {Position.to_position(3, index) for index in footprint} == \
+                   {(position[0] + dx, position[1] + dy) for (dx, dy) in block.dots}
+        assert Block.get_anchor_footprints(block, 3) is footprints
+        assert Block.get_dot_offsets(block, 3) == (0, 1, 5)
+        assert Block.get_dot_offsets(block, 3) is Block.get_dot_offsets(block, 3)
+        Block.add_dot(block, (2, 1))
+        assert len(Block.get_anchor_footprints(block, 3)) == 2
+        assert Block.get_dot_offsets(block, 3) == (0, 1, 5, 6)
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+# Tests for block sources
+
+def test_Block_Source__Reproducible_Streams(score, max_score):
+    """Function make_block_source: same seed and stream give the same indices."""
+    max_score.value += 3
+    try:
+        source = Block.make_block_source(12, chunk_size=5)
+        other_source = Block.make_block_source(12, chunk_size=64)
+        indices = [Block.draw_block_index(source) for _ in range(7)]
+        indices += list(Block.draw_block_indices(source, 300))
+        indices += [Block.draw_block_index(source)]
+        assert indices == list(Block.draw_block_indices(other_source, 308))
+        assert all(0 <= i < len(Block.standard_blocks) for i in indices)
+        assert indices != list(Block.draw_block_indices(Block.make_block_source(12, stream=1), 308))
+        assert Block.select_standard_block(Block.make_block_source(12)) is \
+               Block.standard_blocks[indices[0]]
+        assert Block.select_standard_block() in Block.standard_blocks
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+def test_Block_Source__Weights(score, max_score):
+    """Function make_block_source: blocks with weight zero are never drawn."""
+    max_score.value += 1
+    try:
+        weights = [0] * len(Block.standard_blocks)
+        weights[3] = 1
+        weights[17] = 2
+        indices = Block.draw_block_indices(Block.make_block_source(5, weights=weights), 3000)
+        assert set(indices) == {3, 17}
+        assert 1700 < indices.count(17) < 2300
+        score.value += 1
+    except:
+        print(traceback.format_exc())
+
+def test_render_block__Anchor_Outside_Block(score, max_score):
+    """Function render_block: anchor outside the block."""
+    max_score.value += 1
+    try:
+        the_block = Block.make_block({(1, 1), (2, 1)})
+        assert Block.render_block(the_block) == \
+               "  \u25A9 \u25A9 \n" + \
+               "\u25A2     \n"
+        score.value += 1
+    except:
+        print(traceback.format_exc())
+
+
+def _draw_standard_blocks(_):
+    return [Block.standard_blocks.index(Block.select_standard_block()) for _ in range(40)]
+
+
+def test_Select_Standard_Block__Reseeded_After_Fork(score, max_score):
+    """Function select_standard_block: forked processes draw different blocks."""
+    max_score.value += 2
+    try:
+        import multiprocessing
+        Block.select_standard_block()
+        with multiprocessing.get_context("fork").Pool(3) as pool:
+            sequences = pool.map(_draw_standard_blocks, range(3))
+        assert len({tuple(sequence) for sequence in sequences}) == 3
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
 # collection of block test functions
 
 block_test_functions = \
@@ -354,4 +443,12 @@ block_test_functions = \
 
         test_Normalize__Already_Normalized,
         test_Normalize__Not_Yet_Normalized,
+
+        test_Get_Anchor_Footprints__Single_Case,
+
+        test_Block_Source__Reproducible_Streams,
+        test_Block_Source__Weights,
+
+        test_render_block__Anchor_Outside_Block,
+        test_Select_Standard_Block__Reseeded_After_Fork,
     }
@@ -1,14 +1,26 @@
 import Position
+import Block
+
+import sys
+
+# Filled cells are stored as a set of cell indices x + y*stride, as encoded
+# by Position.to_index. The functions working on positions convert from and
+# to these indices.
+# Boards also keep whether they are known to have no full rows or columns.
+# That is the case after clearing them, and it allows drop_and_clear to only
+# examine the rows and columns touched by the dropped block.
 
 
 class _Board:
 
     def __init__(self, dimension, positions_to_fill):
-        self.dots = set(
-            dot for dot in positions_to_fill
+        self.dimension = dimension
+        self.stride    = dimension + 1
+        self.cells = set(
+            dot[0] + dot[1] * self.stride for dot in positions_to_fill
             if dot[0] <= dimension and dot[1] <= dimension and dot[0] > 0 and dot[1] > 0
         )
-        self.dimension = dimension
+        self.has_no_full_lines = len(self.cells) == 0
 
 
 def make_board(dimension=10, positions_to_fill=frozenset()):
@@ -30,7 +42,12 @@ def copy_board(board):
         ASSUMPTIONS
         - The given board is a proper board.
     """
-    return _Board(board.dimension, board.dots)
+    board_copy = _Board.__new__(_Board)
+    board_copy.dimension = board.dimension
+    board_copy.stride    = board.stride
+    board_copy.cells     = set(board.cells)
+    board_copy.has_no_full_lines = board.has_no_full_lines
+    return board_copy
 
 
 
@@ -44,10 +61,10 @@ def is_proper_board(board):
         - You need to complete the conditions
         (as they depend on the internal representation you have chosen for the board)
     """
-    if board is None or type(board) is not _Board:
+    if board is None or not isinstance(board, _Board):
         return False
-    for dot in board.dots:
-        if not Position.is_proper_position_for_board(board.dimension, dot):
+    for index in board.cells:
+        if not Position.is_proper_index_for_board(board.dimension, index):
             return False
     return True
 
@@ -72,7 +89,8 @@ def get_all_filled_positions(board):
         ASSUMPTIONS
         - The given board is a proper board.
     """
-    return set(board.dots)
+    positions = Position.get_neighbour_tables(board.dimension).positions
+    return {positions[index] for index in board.cells}
 
 
 
@@ -87,7 +105,10 @@ def is_filled_at(board, position):
         - The given board is a proper board.
         - The given position is a proper position.
     """
-    return position in board.dots
+    x, y = position
+    if x < 1 or y < 1 or x > board.dimension or y > board.dimension:
+        return False
+    return x + y * board.stride in board.cells
 
 
 
@@ -104,13 +125,14 @@ def is_filled_row(board, row):
         NOTE
         - You are not allowed to use for statements in the body of this function.
     """
-    if type(row) is not int:
+    if type(row) is not int or row < 1 or row > board.dimension:
         return False
-    i = 1
-    while i <= board.dimension:
-        if (i, row) not in board.dots:
+    index = 1 + row * board.stride
+    end   = index + board.dimension
+    while index < end:
+        if index not in board.cells:
             return False
-        i += 1
+        index += 1
     return True
 
 
@@ -126,8 +148,10 @@ def is_filled_column(board, column):
         NOTE
         - You are not allowed to use while statements in the body of this function.
     """
-    for i in range(board.dimension):
-        if (column, i + 1) not in board.dots:
+    if type(column) is not int or column < 1 or column > board.dimension:
+        return False
+    for index in range(column + board.stride, column + (board.dimension + 1) * board.stride, board.stride):
+        if index not in board.cells:
             return False
     return True
 
@@ -178,7 +202,8 @@ def fill_cell(board, position):
         - The given position is a proper position.
     """
     if Position.is_proper_position_for_board(board.dimension, position):
-        board.dots.add(position)
+        board.cells.add(position[0] + position[1] * board.stride)
+        board.has_no_full_lines = False
 
 
 
@@ -192,7 +217,11 @@ def fill_all_cells(board, positions):
         - The given board is a proper board.
         - Each position in the collection of positions is a proper position.
     """
-    board.dots |= {pos for pos in positions if Position.is_proper_position_for_board(board.dimension, pos)}
+    board.cells |= {
+        pos[0] + pos[1] * board.stride for pos in positions
+        if Position.is_proper_position_for_board(board.dimension, pos)
+    }
+    board.has_no_full_lines = False
 
 
 
@@ -206,7 +235,8 @@ def free_cell(board, position):
         - The given board is a proper board.
         - The given position is a proper position.
     """
-    board.dots.discard(position)
+    if Position.is_proper_position_for_board(board.dimension, position):
+        board.cells.discard(position[0] + position[1] * board.stride)
 
 
 
@@ -225,7 +255,7 @@ def free_all_cells(board, positions):
     if len(positions) == 0:
         return
     pos = positions.pop()
-    board.dots.discard(pos)
+    free_cell(board, pos)
     free_all_cells(board, positions)
 
 
@@ -239,7 +269,9 @@ def free_row(board, row):
         ASSUMPTIONS
         - The given board is a proper board.
     """
-    board.dots.difference_update(((i + 1, row) for i in range(board.dimension)))
+    if type(row) is int and 1 <= row <= board.dimension:
+        start = 1 + row * board.stride
+        board.cells.difference_update(range(start, start + board.dimension))
 
 
 
@@ -252,7 +284,9 @@ def free_column(board, column):
         ASSUMPTIONS
         - The given board is a proper board.
     """
-    board.dots.difference_update(((column, i + 1) for i in range(board.dimension)))
+    if type(column) is int and 1 <= column <= board.dimension:
+        board.cells.difference_update(
+            range(column + board.stride, column + (board.dimension + 1) * board.stride, board.stride))
 
 
 
@@ -272,12 +306,17 @@ def can_be_dropped_at(board, block, position):
         - The given block is a proper block.
         - The given position is a proper position.
     """
-    corrected_position = Position.translate_over(position, *block.topleft)
-    offset_dots = frozenset(Position.translate_over(dot, *position) for dot in block.dots)
-    for x, y in offset_dots:
-        if x < 1 or y < 1 or x > board.dimension or y > board.dimension:
+    x, y = position
+    if x + block.topleft[0] < 1 or y + block.topleft[1] < 1 or \
+            x + block.topleft[0] + block.size[0] > board.dimension or \
+            y + block.topleft[1] + block.size[1] > board.dimension:
+        return False
+    anchor = x + y * board.stride
+    cells = board.cells
+    for offset in Block.get_dot_offsets(block, board.dimension):
+        if anchor + offset in cells:
             return False
-    return not board.dots & offset_dots
+    return True
 
 
 
@@ -293,12 +332,12 @@ def get_droppable_positions(board, block):
         - The function should only examine positions at which the given block
           fully fits within the boundaries of the given board.
     """
+    cells = board.cells
     return [
-        (row + 1, column + 1)
-        for row    in range(-block.topleft[0], -block.topleft[0] + board.dimension - block.size[0] + 1)
-        for column in range(-block.topleft[1], -block.topleft[1] + board.dimension - block.size[1] + 1)
-        if can_be_dropped_at(board, block, (row + 1, column + 1))
-    ];
+        position
+        for position, footprint in Block.get_anchor_footprints(block, board.dimension)
+        if cells.isdisjoint(footprint)
+    ]
 
 
 
@@ -315,8 +354,10 @@ def drop_at(board, block, position):
         - The given position is a proper position.
         - The given block is a proper block.
     """
-    if can_be_dropped_at(board, block, position): 
-        board.dots |= frozenset(Position.translate_over(dot, *position) for dot in block.dots)
+    if can_be_dropped_at(board, block, position):
+        anchor = position[0] + position[1] * board.stride
+        board.cells.update(anchor + offset for offset in Block.get_dot_offsets(block, board.dimension))
+        board.has_no_full_lines = False
 
 
 
@@ -332,6 +373,68 @@ def clear_full_rows_and_columns(board):
         free_row(board, row)
     for column in columns:
         free_column(board, column)
+    board.has_no_full_lines = True
+
+
+
+def drop_and_clear(board, block, position, validate=True):
+    """
+        Drop the given block at the given position on the given board, and clear
+        all full rows and columns, if any, after the drop.
+        - The function returns a tuple of the score obtained from the move, as
+          defined by Game.game_move, followed by a tuple of the numbers of the
+          cleared rows and a tuple of the numbers of the cleared columns, both in
+          ascending order.
+        - Nothing happens and None is returned if the given block can not be
+          dropped at the given position on the given board. That check is
+          skipped if validate is false.
+        - If the board is known to have no full rows or columns before the drop,
+          only the rows and columns touched by the block are examined.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given block is a proper block.
+        - The given position is a proper position.
+        - If validate is false, the given block can be dropped at the given
+          position on the given board.
+    """
+    x, y = position
+    dimension = board.dimension
+    if validate and (x + block.topleft[0] < 1 or y + block.topleft[1] < 1 or
+                     x + block.topleft[0] + block.size[0] > dimension or
+                     y + block.topleft[1] + block.size[1] > dimension):
+        return None
+    stride = board.stride
+    anchor = x + y * stride
+    cells  = board.cells
+    offsets = Block.get_dot_offsets(block, dimension)
+    if validate:
+        for offset in offsets:
+            if anchor + offset in cells:
+                return None
+    cells.update(anchor + offset for offset in offsets)
+
+    if board.has_no_full_lines:
+        rows    = range(y + block.topleft[1], y + block.topleft[1] + block.size[1] + 1)
+        columns = range(x + block.topleft[0], x + block.topleft[0] + block.size[0] + 1)
+    else:
+        rows = columns = range(1, dimension + 1)
+    end = (dimension + 1) * stride
+    full_rows = tuple(
+        row for row in rows
+        if cells.issuperset(range(1 + row * stride, 1 + row * stride + dimension))
+    )
+    full_columns = tuple(
+        column for column in columns
+        if cells.issuperset(range(column + stride, column + end, stride))
+    )
+    for row in full_rows:
+        cells.difference_update(range(1 + row * stride, 1 + row * stride + dimension))
+    for column in full_columns:
+        cells.difference_update(range(column + stride, column + end, stride))
+    board.has_no_full_lines = True
+
+    nb_lines = len(full_rows) + len(full_columns)
+    return len(offsets) + 10 * ((nb_lines + 1) * nb_lines) // 2, full_rows, full_columns
 
 
 
@@ -353,12 +456,12 @@ def are_chainable(board, positions, chained=None, nextpos=None, is_filled=None):
     if chained is None:
         chained = set()
         for nextpos in positions:
-            is_filled = nextpos in board.dots
+            is_filled = is_filled_at(board, nextpos)
             break
         else:
             return True
     for adjpos in Position.get_adjacent_positions(nextpos, board.dimension):
-        if (adjpos in board.dots) == is_filled and adjpos not in chained:
+        if is_filled_at(board, adjpos) == is_filled and adjpos not in chained:
             chained.add(adjpos)
             if not (set(positions) - chained) or are_chainable(board, positions, chained, adjpos, is_filled):
                 return True
@@ -366,21 +469,100 @@ def are_chainable(board, positions, chained=None, nextpos=None, is_filled=None):
 
 
 
-def print_board(board):
+def get_filled_indices(board):
+    """
+        Return a set of the cell indices of all filled cells on the given board.
+        - Cell indices are encoded as described in Position.to_index.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    return set(board.cells)
+
+
+
+def is_filled_at_index(board, index):
+    """
+        Return a boolean indicating whether or not the cell with the given index
+        on the given board is filled.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given index is a cell index for the given board.
+    """
+    return index in board.cells
+
+
+
+def can_be_dropped_on(board, footprint):
+    """
+        Check whether all cells with an index in the given footprint are free.
+        - Footprints are obtained from Block.get_anchor_footprints.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - Each index in the given footprint is a cell index for the given board.
+    """
+    return board.cells.isdisjoint(footprint)
+
+
+
+def get_droppable_footprints(board, block):
+    """
+        Return a list of all (position, footprint) pairs of Block.get_anchor_footprints
+        at which the given block can be dropped on the given board.
+        - The pairs in the resulting list are in the same order as the positions
+          returned by get_droppable_positions.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given block is a proper block.
+    """
+    cells = board.cells
+    return [
+        pair for pair in Block.get_anchor_footprints(block, board.dimension)
+        if cells.isdisjoint(pair[1])
+    ]
+
+
+
+def fill_indices(board, footprint):
+    """
+        Fill all the cells with an index in the given footprint.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - Each index in the given footprint is a cell index for the given board.
+    """
+    board.cells.update(footprint)
+    board.has_no_full_lines = False
+
+
+
+def render_board(board, viewport=None):
+    """
+        Return the print-out of the given board, as printed by print_board.
+        - If a viewport is given, as a tuple of the leftmost column, the bottom
+          row, the number of columns and the number of rows, only the part of the
+          board within that viewport is rendered.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    dim = dimension(board)
+    left, bottom, nb_columns, nb_rows = viewport or (1, 1, dim, dim)
+    columns = range(max(left, 1), min(left + nb_columns, dim + 1))
+    cells, stride = board.cells, board.stride
+    lines = []
+    for row in range(min(bottom + nb_rows - 1, dim), max(bottom, 1) - 1, -1):
+        base = row * stride
+        lines.append('{:02d}  '.format(row) + "".join(
+            " \u25A9  " if base + column in cells else "    " for column in columns))
+    lines.append("    " + "".join('{:02d}  '.format(column) for column in columns))
+    return "\n".join(lines) + "\n"
+
+
+def print_board(board, viewport=None):
     """
         Print the given board on the standard output stream.
+        - If a viewport is given, only the part of the board within that viewport
+          is printed, as described in render_board.
+        - The print-out is written at once.
         ASSUMPTIONS
         - The given board is a proper board.
     """
-    for row in range(dimension(board), 0, -1):
-        print('{:02d}'.format(row), end="  ")
-        for column in range(1, dimension(board) + 1):
-            if is_filled_at(board, (column, row)):
-                print(" \u25A9 ", end=" ")
-            else:
-                print("   ", end=" ")
-        print()
-    print("    ", end="")
-    for column in range(1, dimension(board) + 1):
-        print('{:02d}'.format(column), end="  ")
-    print()
+    sys.stdout.write(render_board(board, viewport))
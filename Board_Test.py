@@ -1,5 +1,6 @@
 import Board
 import Block
+import Position
 import traceback
 
 
@@ -803,6 +804,103 @@ def test_Are_Chained__Non_Adjacent_Unchained_Positions(score, max_score):
         print(traceback.format_exc())
 
 
+# Tests for the cell index fast path
+
+def test_Filled_Indices__Match_Filled_Positions(score, max_score):
+    """Functions get_filled_indices and is_filled_at_index: match the filled positions."""
+    max_score.value += 1
+    try:
+        the_board = Board.make_board(4, {(1, 1), (4, 1), (1, 4), (3, 2)})
+        assert {Position.to_position(4, index) for index in Board.get_filled_indices(the_board)} == \
+               Board.get_all_filled_positions(the_board)
+        assert Board.is_filled_at_index(the_board, Position.to_index(4, (4, 1)))
+        assert not Board.is_filled_at_index(the_board, Position.to_index(4, (1, 2)))
+        assert not Board.is_filled_at(the_board, (5, 0))
+        score.value += 1
+    except:
+        print(traceback.format_exc())
+
+
+def test_Get_Droppable_Footprints__Match_Droppable_Positions(score, max_score):
+    """Function get_droppable_footprints: same positions as get_droppable_positions."""
+    max_score.value += 2
+    try:
+        the_board = Board.make_board(5, {(1, 1), (2, 3), (4, 4), (5, 2)})
+        for block in Block.standard_blocks:
+            pairs = Board.get_droppable_footprints(the_board, block)
+            assert [position for position, _ in pairs] == \
+                   Board.get_droppable_positions(the_board, block)
+            for position, footprint in pairs:
+                assert Board.can_be_dropped_on(the_board, footprint)
+                board_copy = Board.copy_board(the_board)
+                Board.fill_indices(board_copy, footprint)
+                other_copy = Board.copy_board(the_board)
+                Board.drop_at(other_copy, block, position)
+                assert Board.get_all_filled_positions(board_copy) == \
+                       Board.get_all_filled_positions(other_copy)
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+# Tests for drop_and_clear
+
+def test_Drop_And_Clear__Same_As_Separate_Steps(score, max_score):
+    """Function drop_and_clear: same result as drop_at and clear_full_rows_and_columns."""
+    max_score.value += 4
+    try:
+        import random
+        generator = random.Random(2)
+        for initial in ({(1, 2), (2, 2), (3, 2), (4, 2), (5, 2), (3, 3)}, {(2, 1), (4, 4)}):
+            the_board = Board.make_board(5, initial)
+            other_board = Board.make_board(5, initial)
+            for _ in range(60):
+                block = generator.choice(Block.standard_blocks)
+                positions = Board.get_droppable_positions(the_board, block)
+                if len(positions) == 0:
+                    assert Board.drop_and_clear(the_board, block, (3, 3)) is None
+                    continue
+                position = generator.choice(positions)
+                Board.drop_at(other_board, block, position)
+                rows = tuple(Board.get_all_filled_rows(other_board))
+                columns = tuple(sorted(Board.get_all_filled_columns(other_board)))
+                Board.clear_full_rows_and_columns(other_board)
+                nb_lines = len(rows) + len(columns)
+                assert Board.drop_and_clear(the_board, block, position) == \
+                       (len(block.dots) + 10 * (nb_lines + 1) * nb_lines // 2, rows, columns)
+                assert Board.get_all_filled_positions(the_board) == \
+                       Board.get_all_filled_positions(other_board)
+        the_board = Board.make_board(3, {(1, 1)})
+        assert Board.drop_and_clear(the_board, Block.standard_blocks[0], (1, 1)) is None
+        assert Board.drop_and_clear(the_board, Block.standard_blocks[2], (1, 2)) is None
+        assert Board.get_all_filled_positions(the_board) == {(1, 1)}
+        score.value += 4
+    except:
+        print(traceback.format_exc())
+
+
+# tests for render_board
+
+def test_render_board__Whole_Board_And_Viewport(score, max_score):
+    """Function render_board: whole board and part of it within a viewport."""
+    max_score.value += 2
+    try:
+        the_board = Board.make_board(3, {(1, 1), (3, 2)})
+        dot = " \u25A9  "
+        assert Board.render_board(the_board) == \
+               "03              \n" + \
+               "02          " + dot + "\n" + \
+               "01  " + dot + "        \n" + \
+               "    01  02  03  \n"
+        assert Board.render_board(the_board, (2, 1, 5, 2)) == \
+               "02      " + dot + "\n" + \
+               "01          \n" + \
+               "    02  03  \n"
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
 board_test_functions = \
     {
         test_Make_Board__No_Filled_Dots,
@@ -872,4 +970,11 @@ board_test_functions = \
         test_Are_Chained__Adjacent_Positions,
         test_Are_Chained__Non_Adjacent_Chained_Positions,
         test_Are_Chained__Non_Adjacent_Unchained_Positions,
+
+        test_Filled_Indices__Match_Filled_Positions,
+        test_Get_Droppable_Footprints__Match_Droppable_Positions,
+
+        test_Drop_And_Clear__Same_As_Separate_Steps,
+
+        test_render_board__Whole_Board_And_Viewport,
     }
@@ -0,0 +1,185 @@
+import Board
+
+import mmap
+import os
+import struct
+
+# Corpora of boards stored on disk in fixed-size records, read through a
+# memory map without parsing or copying the file.
+# - The file starts with a header of 16 bytes: the magic bytes, a version, the
+#   dimension of all boards as a 16-bit number, the size of each record in
+#   bytes as a 32-bit number and the number of boards as a 32-bit number.
+# - Each record is a packed bitmap of dimension*dimension bits, padded to a
+#   whole number of bytes. The bit for the cell at position (x, y) is the bit
+#   (x - 1)*dimension + (y - 1), counting from the least significant bit of the
+#   first byte. Unpacked, a record thus has the layout of a board in
+#   Simulator.GameBatch.
+
+MAGIC   = b"1010C"
+VERSION = 1
+
+_header = struct.Struct("<5sBHII")
+
+
+def _get_record_size(dimension):
+    return (dimension * dimension + 7) // 8
+
+
+def pack_board(board):
+    """
+        Return the packed bitmap of the given board, as stored in a corpus.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    dimension = Board.dimension(board)
+    bits = 0
+    for x, y in Board.get_all_filled_positions(board):
+        bits |= 1 << ((x - 1) * dimension + (y - 1))
+    return bits.to_bytes(_get_record_size(dimension), "little")
+
+
+def write_corpus(path, boards):
+    """
+        Write the given boards to a new corpus file at the given path.
+        - The function returns the number of boards written.
+        - A ValueError is raised if the boards do not all have the same dimension
+          or if there are no boards.
+        ASSUMPTIONS
+        - Each of the given boards is a proper board.
+    """
+    with open(path, "wb") as file:
+        file.write(bytes(_header.size))
+        dimension, count = None, 0
+        for board in boards:
+            if dimension is None:
+                dimension = Board.dimension(board)
+            elif Board.dimension(board) != dimension:
+                raise ValueError("All boards in a corpus must have the same dimension")
+            file.write(pack_board(board))
+            count += 1
+        if dimension is None:
+            raise ValueError("A corpus must hold at least one board")
+        file.seek(0)
+        file.write(_header.pack(MAGIC, VERSION, dimension, _get_record_size(dimension), count))
+    return count
+
+
+class _Corpus:
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < _header.size:
+                raise ValueError("Not a corpus of version {}".format(VERSION))
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.dimension, self.record_size, self.count = \
+            _header.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError("Not a corpus of version {}".format(VERSION))
+        if self.dimension < 1 or self.record_size != _get_record_size(self.dimension):
+            self.map.close()
+            raise ValueError("Corpus header does not match its dimension")
+        if len(self.map) < _header.size + self.count * self.record_size:
+            self.map.close()
+            raise ValueError("Corpus is shorter than its {} boards".format(self.count))
+        self.data = memoryview(self.map)[_header.size:_header.size + self.count * self.record_size]
+        # Cell index (see Position.to_index) of each bit in a record.
+        stride = self.dimension + 1
+        self.cell_of_bit = [
+            (bit // self.dimension + 1) + (bit % self.dimension + 1) * stride
+            for bit in range(self.dimension * self.dimension)
+        ]
+
+
+class _BoardView(Board._Board):
+
+    # A read-only board backed by a record of a corpus. Its filled cells are only
+    # decoded when first needed, into a frozen set, so that functions that would
+    # modify the board fail. Board.copy_board yields a regular, mutable board.
+
+    def __init__(self, corpus, record):
+        self.dimension = corpus.dimension
+        self.stride    = corpus.dimension + 1
+        self.record    = record
+        self.cell_of_bit = corpus.cell_of_bit
+        self._cells    = None
+        self.has_no_full_lines = False
+
+    @property
+    def cells(self):
+        if self._cells is None:
+            bits, cells = int.from_bytes(self.record, "little"), []
+            while bits:
+                low = bits & -bits
+                cells.append(self.cell_of_bit[low.bit_length() - 1])
+                bits ^= low
+            self._cells = frozenset(cells)
+        return self._cells
+
+
+def open_corpus(path):
+    """
+        Open the corpus stored in the file at the given path.
+        - The file is memory mapped, not read. Close the corpus with close_corpus.
+        - A ValueError is raised if the file is not a corpus.
+    """
+    return _Corpus(path)
+
+
+def close_corpus(corpus):
+    """
+        Close the given corpus.
+        - A BufferError is raised if views or arrays obtained from the corpus are
+          still referenced.
+    """
+    corpus.data.release()
+    corpus.map.close()
+
+
+def get_dimension(corpus):
+    """
+        Return the dimension of the boards in the given corpus.
+    """
+    return corpus.dimension
+
+
+def get_number_of_boards(corpus):
+    """
+        Return the number of boards in the given corpus.
+    """
+    return corpus.count
+
+
+def get_board(corpus, number):
+    """
+        Return a read-only view on the board with the given number in the given
+        corpus, that can be passed to the query functions of the module Board.
+        ASSUMPTIONS
+        - The given number is not negative and below the number of boards.
+    """
+    start = number * corpus.record_size
+    return _BoardView(corpus, corpus.data[start:start + corpus.record_size])
+
+
+def get_packed_array(corpus):
+    """
+        Return a read-only NumPy array of shape (N, record size) of type uint8
+        holding the packed records of all boards in the given corpus.
+        - The array is a view on the memory map; nothing is copied.
+    """
+    import numpy
+    return numpy.frombuffer(corpus.data, dtype=numpy.uint8).reshape(corpus.count, corpus.record_size)
+
+
+def get_boards_array(corpus, start=0, stop=None):
+    """
+        Return a NumPy array of shape (n, D, D) of type bool with the boards in
+        the given corpus from the given start number up to the given stop number.
+        - The cell at position (x, y) of a board is at index [x - 1, y - 1].
+        - The boards are unpacked, and thus copied, from the memory map.
+    """
+    import numpy
+    packed = get_packed_array(corpus)[start:stop]
+    d = corpus.dimension
+    bits = numpy.unpackbits(packed, axis=1, count=d * d, bitorder="little")
+    return bits.reshape(len(packed), d, d).view(bool)
@@ -0,0 +1,115 @@
+import Board
+import Corpus
+import Game
+import os
+import tempfile
+import traceback
+
+
+# tests for board corpora
+
+def _make_boards():
+    boards = []
+    for seed in range(12):
+        session = Game.GameSession(7, seed)
+        for _ in range(seed):
+            if session.is_over():
+                break
+            session.step(session.legal_moves()[-1])
+        boards.append(Board.copy_board(session.board))
+    return boards
+
+
+def test_Corpus__Board_Views(score, max_score):
+    """Function get_board: views answer queries like the stored boards."""
+    max_score.value += 3
+    try:
+        boards = _make_boards()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus.bin")
+            assert Corpus.write_corpus(path, iter(boards)) == len(boards)
+            corpus = Corpus.open_corpus(path)
+            assert Corpus.get_dimension(corpus) == 7
+            assert Corpus.get_number_of_boards(corpus) == len(boards)
+            for number, board in enumerate(boards):
+                view = Corpus.get_board(corpus, number)
+                assert Board.is_proper_board(view)
+                assert Board.get_all_filled_positions(view) == Board.get_all_filled_positions(board)
+                assert Board.get_all_filled_rows(view) == Board.get_all_filled_rows(board)
+                for block in Game.normalized_standard_blocks[::4]:
+                    assert Board.get_droppable_positions(view, block) == \
+                           Board.get_droppable_positions(board, block)
+                try:
+                    Board.fill_cell(view, (1, 1))
+                    assert False
+                except AttributeError:
+                    pass
+                board_copy = Board.copy_board(view)
+                Board.fill_cell(board_copy, (4, 4))
+                assert Board.is_filled_at(board_copy, (4, 4))
+            del view
+            Corpus.close_corpus(corpus)
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+def test_Corpus__Arrays(score, max_score):
+    """Functions get_packed_array and get_boards_array: arrays of all boards."""
+    max_score.value += 2
+    try:
+        boards = _make_boards()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus.bin")
+            Corpus.write_corpus(path, boards)
+            corpus = Corpus.open_corpus(path)
+            packed = Corpus.get_packed_array(corpus)
+            assert packed.shape == (len(boards), 7) and not packed.flags.writeable
+            for number, board in enumerate(boards):
+                assert bytes(packed[number]) == Corpus.pack_board(board)
+            array = Corpus.get_boards_array(corpus, 2, 5)
+            assert array.shape == (3, 7, 7)
+            for number in range(3):
+                filled = {(int(x) + 1, int(y) + 1) for x, y in zip(*array[number].nonzero())}
+                assert filled == Board.get_all_filled_positions(boards[number + 2])
+            del packed
+            Corpus.close_corpus(corpus)
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_Open_Corpus__Malformed_Files(score, max_score):
+    """Function open_corpus: short files and inconsistent headers are rejected."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus.bin")
+            Corpus.write_corpus(path, _make_boards()[:10])
+            with open(path, "rb") as file:
+                content = file.read()
+            malformed = [content[:-7], content[:-1], content[:15], b"",
+                         content[:8] + b"\x05\x00\x00\x00" + content[12:],
+                         content[:6] + b"\x00\x00" + content[8:]]
+            for bad_content in malformed:
+                with open(path, "wb") as file:
+                    file.write(bad_content)
+                try:
+                    Corpus.open_corpus(path)
+                    assert False, bad_content[:16]
+                except ValueError:
+                    pass
+            with open(path, "wb") as file:
+                file.write(content)
+            Corpus.close_corpus(Corpus.open_corpus(path))
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+corpus_test_functions = \
+    {
+        test_Corpus__Board_Views,
+        test_Corpus__Arrays,
+        test_Open_Corpus__Malformed_Files,
+    }
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+# Export training data for a placement-value model: triples of a board, a block
+# and the best position to drop that block on that board.
+# - Boards are reachable boards: the board of a game of random moves, stopped
+#   after a random number of moves.
+# - For each board and each block of Game.normalized_standard_blocks, the best
+#   position and its score are those of Game.highest_score for that block alone.
+#   Blocks that cannot be dropped get position (0, 0) and score -1.
+# - Triples are written in shards, i.e. .npz files of columns: "boards" holds
+#   the packed bitmap of each board once, as stored by Corpus.pack_board, and
+#   for each triple "board_indices" holds the row of its board in "boards",
+#   "blocks" its block index, "anchors" its best position and "scores" its
+#   score. "dimension", "seed" and "max_moves" hold the parameters with which
+#   the shard was generated.
+# - Shard s only depends on the seed and on s, so that shards can be generated
+#   in parallel and in any order. Existing shards are not generated again, so
+#   that an interrupted export can be resumed, provided that they were generated
+#   with the same parameters and hold as many boards as requested.
+
+import Board
+import Corpus
+import Game
+
+import multiprocessing
+import os
+import random
+
+
+def generate_board(session, generator, max_moves):
+    """
+        Return a copy of the board of the given game session after playing at most
+        the given number of random moves, chosen with the given random generator.
+    """
+    session.reset(generator.getrandbits(64))
+    for _ in range(generator.randint(0, max_moves)):
+        if session.is_over():
+            break
+        session.step(generator.choice(session.legal_moves()))
+    return Board.copy_board(session.board)
+
+
+def generate_shard(dimension, seed, shard, nb_boards, max_moves=40):
+    """
+        Return a dictionary of the columns of the given shard, with the given
+        number of boards of the given dimension, each reached after at most the
+        given number of moves.
+    """
+    import numpy
+    generator = random.Random("{}:{}".format(seed, shard))
+    session = Game.GameSession(dimension)
+    nb_blocks = len(Game.normalized_standard_blocks)
+    boards  = []
+    board_indices = numpy.repeat(numpy.arange(nb_boards, dtype=numpy.int32), nb_blocks)
+    blocks  = numpy.tile(numpy.arange(nb_blocks, dtype=numpy.uint8), nb_boards)
+    anchors = numpy.zeros((nb_boards * nb_blocks, 2), dtype=numpy.int16)
+    scores  = numpy.full(nb_boards * nb_blocks, -1, dtype=numpy.int32)
+    for number in range(nb_boards):
+        board = generate_board(session, generator, max_moves)
+        boards.append(Corpus.pack_board(board))
+        for block_index, block in enumerate(Game.normalized_standard_blocks):
+            row = number * nb_blocks + block_index
+            best_score, best_positions = Game.highest_score(board, [block])
+            if best_score is not None:
+                anchors[row] = best_positions[0]
+                scores[row]  = best_score
+    return {
+        "dimension": numpy.array(dimension),
+        "seed": numpy.array(seed),
+        "max_moves": numpy.array(max_moves),
+        "boards": numpy.frombuffer(b"".join(boards), dtype=numpy.uint8).reshape(len(boards), -1),
+        "board_indices": board_indices,
+        "blocks": blocks,
+        "anchors": anchors,
+        "scores": scores,
+    }
+
+
+def get_shard_path(directory, shard):
+    return os.path.join(directory, "shard-{:05d}.npz".format(shard))
+
+
+def export_shard(task):
+    """
+        Generate the shard described by the given (directory, dimension, seed,
+        shard, number of boards, maximum number of moves) tuple and write it,
+        unless it already exists.
+        - The function returns the path of the shard and whether it was written.
+        - A ValueError is raised if the shard already exists with another
+          dimension, seed, maximum number of moves or number of boards.
+    """
+    import numpy
+    directory, dimension, seed, shard, nb_boards, max_moves = task
+    path = get_shard_path(directory, shard)
+    if os.path.exists(path):
+        with numpy.load(path) as existing:
+            parameters = ("board_indices", "dimension", "seed", "max_moves")
+            if not all(name in existing.files for name in parameters) or \
+                    (int(existing["dimension"]), int(existing["seed"]), int(existing["max_moves"]),
+                     len(existing["boards"])) != (dimension, seed, max_moves, nb_boards):
+                raise ValueError("Cannot resume: {} does not hold {} boards of dimension {} "
+                                 "with seed {} and at most {} moves".format(
+                                     path, nb_boards, dimension, seed, max_moves))
+        return path, False
+    columns = generate_shard(dimension, seed, shard, nb_boards, max_moves)
+    partial = path + ".partial"
+    with open(partial, "wb") as file:
+        numpy.savez_compressed(file, **columns)
+    os.replace(partial, path)
+    return path, True
+
+
+def export(directory, nb_shards, nb_boards, dimension=8, seed=0, workers=None, max_moves=40):
+    """
+        Export the given number of shards, each with the given number of boards of
+        the given dimension, reached after at most the given number of moves, to
+        the given directory, using a pool of the given number of worker processes.
+        - The function returns the number of shards that were written, not
+          counting shards that already existed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    tasks = [(directory, dimension, seed, shard, nb_boards, max_moves) for shard in range(nb_shards)]
+    with multiprocessing.Pool(workers) as pool:
+        return sum(written for _, written in pool.imap_unordered(export_shard, tasks))
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Export (board, block, best move) triples.")
+    parser.add_argument("directory")
+    parser.add_argument("-n", "--shards", type=int, default=16)
+    parser.add_argument("-b", "--boards", type=int, default=256, help="boards per shard")
+    parser.add_argument("-d", "--dimension", type=int, default=8)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-m", "--max-moves", type=int, default=40,
+                        help="most random moves played to reach a board (default: 40)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    args = parser.parse_args()
+    try:
+        written = export(args.directory, args.shards, args.boards, args.dimension, args.seed,
+                         args.workers, args.max_moves)
+    except ValueError as error:
+        parser.error(str(error))
+    print("Wrote", written, "of", args.shards, "shards to", args.directory)
@@ -0,0 +1,92 @@
+import Board
+import Dataset
+import Game
+import os
+import tempfile
+import traceback
+
+
+# tests for the training data exporter
+
+def test_Export__Best_Moves(score, max_score):
+    """Function export: shards hold the best move of each block on each board."""
+    max_score.value += 3
+    try:
+        import numpy
+        with tempfile.TemporaryDirectory() as directory:
+            assert Dataset.export(directory, 2, 3, 5, seed=4, workers=2) == 2
+            shard = numpy.load(Dataset.get_shard_path(directory, 1))
+            nb_blocks = len(Game.normalized_standard_blocks)
+            assert (int(shard["dimension"]), int(shard["seed"]), int(shard["max_moves"])) == (5, 4, 40)
+            assert len(shard["boards"]) == 3
+            assert len(shard["board_indices"]) == len(shard["blocks"]) == len(shard["scores"]) == 3 * nb_blocks
+            for row in range(0, 3 * nb_blocks, 5):
+                assert shard["board_indices"][row] == row // nb_blocks
+                bits = numpy.unpackbits(shard["boards"][shard["board_indices"][row]], count=25, bitorder="little").reshape(5, 5)
+                the_board = Board.make_board(5, {(int(x) + 1, int(y) + 1) for x, y in zip(*bits.nonzero())})
+                block = Game.normalized_standard_blocks[shard["blocks"][row]]
+                best_score, best_positions = Game.highest_score(the_board, [block])
+                if best_score is None:
+                    assert shard["scores"][row] == -1
+                else:
+                    assert shard["scores"][row] == best_score
+                    assert tuple(int(c) for c in shard["anchors"][row]) == best_positions[0]
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+def test_Export__Deterministic_And_Resumable(score, max_score):
+    """Function export: shards depend only on the seed, existing shards are kept."""
+    max_score.value += 2
+    try:
+        import numpy
+        with tempfile.TemporaryDirectory() as directory:
+            assert Dataset.export_shard((directory, 5, 9, 3, 2, 40)) == \
+                   (Dataset.get_shard_path(directory, 3), True)
+            assert Dataset.export(directory, 4, 2, 5, seed=9, workers=1) == 3
+            assert Dataset.export(directory, 4, 2, 5, seed=9, workers=1) == 0
+            first = numpy.load(Dataset.get_shard_path(directory, 3))
+            columns = Dataset.generate_shard(5, 9, 3, 2)
+            for name in ("boards", "board_indices", "blocks", "anchors", "scores"):
+                assert (first[name] == columns[name]).all()
+            assert sorted(os.listdir(directory)) == \
+                   [os.path.basename(Dataset.get_shard_path(directory, s)) for s in range(4)]
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_Export__Mismatched_Shards_Refused(score, max_score):
+    """Function export_shard: existing shards of other parameters are refused."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            assert Dataset.export_shard((directory, 5, 9, 0, 2, 40))[1]
+            assert Dataset.export_shard((directory, 5, 9, 0, 2, 40)) == \
+                   (Dataset.get_shard_path(directory, 0), False)
+            for task in ((directory, 6, 9, 0, 2, 40), (directory, 5, 9, 0, 3, 40),
+                         (directory, 5, 999, 0, 2, 40), (directory, 5, 9, 0, 2, 10)):
+                try:
+                    Dataset.export_shard(task)
+                    assert False, task
+                except ValueError:
+                    pass
+        with tempfile.TemporaryDirectory() as directory:
+            assert Dataset.export(directory, 2, 2, 5, seed=1, workers=1) == 2
+            try:
+                Dataset.export(directory, 3, 2, 5, seed=999, workers=1)
+                assert False
+            except ValueError:
+                pass
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+dataset_test_functions = \
+    {
+        test_Export__Best_Moves,
+        test_Export__Deterministic_And_Resumable,
+        test_Export__Mismatched_Shards_Refused,
+    }
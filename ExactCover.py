@@ -0,0 +1,148 @@
+import Block
+import Board
+
+# Exact cover of a region of a board by a multiset of blocks, solved with
+# Knuth's Algorithm X.
+# - The columns of the exact cover problem are the cells of the region, each of
+#   which must be covered exactly once. The rows are all placements of a block
+#   at one of its droppable positions on the board, as returned by
+#   Board.get_droppable_positions, that lie entirely within the region.
+# - Columns and rows are linked through a dictionary mapping each column to the
+#   set of its rows, and a dictionary mapping each row to the list of its
+#   columns. Covering and uncovering rows and columns then amounts to removing
+#   them from and restoring them to those sets, as in Dancing Links.
+# - Blocks that occur several times in the multiset give rise to a single row
+#   per position, and a count of how many of them are left. Once that count
+#   drops to 0, the remaining rows of the block are removed. As a result, every
+#   tiling is found exactly once.
+
+
+def _select(columns, rows, row):
+    removed = []
+    for column in rows[row]:
+        for other_row in columns[column]:
+            for other_column in rows[other_row]:
+                if other_column != column:
+                    columns[other_column].remove(other_row)
+        removed.append(columns.pop(column))
+    return removed
+
+
+def _deselect(columns, rows, row, removed):
+    for column in reversed(rows[row]):
+        columns[column] = removed.pop()
+        for other_row in columns[column]:
+            for other_column in rows[other_row]:
+                if other_column != column:
+                    columns[other_column].add(other_row)
+
+
+def _is_active(columns, rows, row):
+    first = rows[row][0]
+    return first in columns and row in columns[first]
+
+
+def _search(columns, rows, kinds, kind_rows, counts, solution):
+    if not columns:
+        yield list(solution)
+        return
+    column = min(columns, key=lambda c: len(columns[c]))
+    for row in sorted(columns[column]):
+        solution.append(row)
+        removed = _select(columns, rows, row)
+        kind = kinds[row]
+        counts[kind] -= 1
+        exhausted = []
+        if counts[kind] == 0:
+            exhausted = [other_row for other_row in kind_rows[kind]
+                         if _is_active(columns, rows, other_row)]
+            for other_row in exhausted:
+                for other_column in rows[other_row]:
+                    columns[other_column].remove(other_row)
+        yield from _search(columns, rows, kinds, kind_rows, counts, solution)
+        for other_row in exhausted:
+            for other_column in rows[other_row]:
+                columns[other_column].add(other_row)
+        counts[kind] += 1
+        _deselect(columns, rows, row, removed)
+        solution.pop()
+
+
+def get_tilings(board, blocks, region=None, use_all_blocks=True):
+    """
+        Return an iterator over all tilings of the given region of the given
+        board by blocks of the given collection of blocks.
+        - A tiling is a list of (block, position) pairs, such that dropping each
+          of its blocks at its position on the given board fills each free cell
+          of the region exactly once, without filling any cell outside the region.
+        - If no region is given, the region consists of all free cells of the board.
+        - If use_all_blocks is true, each block of the given collection must be
+          used in the tiling. Otherwise, blocks of the collection may be left out.
+          A block occurring several times in the collection may be used as many
+          times as it occurs.
+        - Tilings that only differ in which of several identical blocks is
+          dropped at some position, are only generated once.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - Each block in the given collection is a proper block.
+        - The given region is None or a collection of proper positions for the
+          given board.
+    """
+    dimension = Board.dimension(board)
+    obstacles = Board.copy_board(board)
+    if region is not None:
+        region = set(region)
+        Board.fill_all_cells(obstacles, {(x, y) for x in range(1, dimension + 1)
+                                         for y in range(1, dimension + 1)} - region)
+    cells = {(x, y) for x in range(1, dimension + 1) for y in range(1, dimension + 1)
+             if not Board.is_filled_at(obstacles, (x, y))}
+
+    kinds_of_blocks, counts = [], []
+    for block in blocks:
+        for kind, other_block in enumerate(kinds_of_blocks):
+            if Block.get_all_dot_positions(other_block) == Block.get_all_dot_positions(block):
+                counts[kind] += 1
+                break
+        else:
+            kinds_of_blocks.append(block)
+            counts.append(1)
+
+    if use_all_blocks and \
+            sum(len(Block.get_all_dot_positions(block)) for block in blocks) != len(cells):
+        return iter(())
+
+    columns = {cell: set() for cell in cells}
+    rows, kinds, placements = [], [], []
+    kind_rows = [[] for _ in kinds_of_blocks]
+    for kind, block in enumerate(kinds_of_blocks):
+        dots = Block.get_all_dot_positions(block)
+        for x, y in Board.get_droppable_positions(obstacles, block):
+            row = len(rows)
+            rows.append([(x + dx, y + dy) for dx, dy in dots])
+            kinds.append(kind)
+            kind_rows[kind].append(row)
+            placements.append((block, (x, y)))
+            for column in rows[row]:
+                columns[column].add(row)
+
+    return ([placements[row] for row in solution]
+            for solution in _search(columns, rows, kinds, kind_rows, counts, []))
+
+
+def can_be_filled(board, blocks, region=None, use_all_blocks=True):
+    """
+        Check whether the given region of the given board can be tiled by blocks
+        of the given collection of blocks, as described in get_tilings.
+        - If no region is given, the region consists of all free cells of the board.
+    """
+    for _ in get_tilings(board, blocks, region, use_all_blocks):
+        return True
+    return False
+
+
+def count_tilings(board, blocks, region=None, use_all_blocks=True):
+    """
+        Return the number of tilings of the given region of the given board by
+        blocks of the given collection of blocks, as described in get_tilings.
+    """
+    return sum(1 for _ in get_tilings(board, blocks, region, use_all_blocks))
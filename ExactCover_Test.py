@@ -0,0 +1,92 @@
+import Block
+import Board
+import ExactCover
+import traceback
+
+
+# tests for the exact cover solver
+
+def _brute_force_tilings(board, blocks, region):
+    # All sets of distinct placements of the given kinds of blocks that exactly
+    # cover the region, for blocks that may be used any number of times, found by
+    # trying all placements that cover the smallest uncovered cell.
+    placements = []
+    for block in blocks:
+        for position in Board.get_droppable_positions(board, block):
+            footprint = frozenset((position[0] + dx, position[1] + dy)
+                                  for dx, dy in Block.get_all_dot_positions(block))
+            if footprint <= region:
+                placements.append(footprint)
+    tilings = []
+
+    def extend(uncovered, tiling):
+        if not uncovered:
+            tilings.append(list(tiling))
+            return
+        cell = min(uncovered)
+        for footprint in placements:
+            if cell in footprint and footprint <= uncovered:
+                tiling.append(footprint)
+                extend(uncovered - footprint, tiling)
+                tiling.pop()
+
+    extend(frozenset(region), [])
+    return tilings
+
+
+def test_Get_Tilings__Full_Board(score, max_score):
+    """Function get_tilings: tilings of a full board cover each cell once."""
+    max_score.value += 3
+    try:
+        the_board = Board.make_board(2)
+        square = Block.make_block({(0, 0), (1, 0), (0, 1), (1, 1)})
+        assert list(ExactCover.get_tilings(the_board, [square])) == [[(square, (1, 1))]]
+        assert not ExactCover.can_be_filled(the_board, [square, square])
+        assert ExactCover.can_be_filled(the_board, [square, square], use_all_blocks=False)
+        single = Block.make_block({(0, 0)})
+        assert ExactCover.count_tilings(the_board, [single] * 4) == 1
+        the_board = Board.make_board(4, {(1, 1), (4, 4)})
+        horizontal = Block.make_block({(0, 0), (1, 0)})
+        vertical = Block.make_block({(0, 0), (0, 1)})
+        for tiling in ExactCover.get_tilings(the_board, [horizontal] * 7 + [vertical] * 7, None, False):
+            filled = Board.copy_board(the_board)
+            for block, position in tiling:
+                assert Board.can_be_dropped_at(filled, block, position)
+                Board.drop_at(filled, block, position)
+            assert len(Board.get_all_filled_positions(filled)) == 16
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+def test_Count_Tilings__Same_As_Brute_Force(score, max_score):
+    """Function count_tilings: same number of tilings as brute force enumeration."""
+    max_score.value += 3
+    try:
+        the_board = Board.make_board(4, {(2, 2)})
+        region = {(x, y) for x in range(1, 5) for y in range(1, 4)} - {(2, 2)}
+        blocks = [Block.make_block({(0, 0), (1, 0)}),
+                  Block.make_block({(0, 0), (0, 1)}),
+                  Block.make_block({(0, 0), (1, 0), (0, 1)}),
+                  Block.make_block({(0, 0)})]
+        expected = len(_brute_force_tilings(the_board, blocks, frozenset(region)))
+        assert expected > 0
+        assert ExactCover.count_tilings(the_board, blocks * 11, region, False) == expected
+        assert ExactCover.count_tilings(Board.make_board(2, {(1, 1)}), blocks[3:], None, True) == 0
+        assert ExactCover.count_tilings(Board.make_board(4), [blocks[0]] * 4, None, True) == 0
+        full_board = frozenset((x, y) for x in range(1, 5) for y in range(1, 5))
+        domino_tilings = _brute_force_tilings(Board.make_board(4), blocks[:2], full_board)
+        assert len(domino_tilings) == 36
+        assert ExactCover.count_tilings(Board.make_board(4), blocks[:2] * 4, None, True) == \
+               sum(1 for tiling in domino_tilings
+                   if sum(1 for footprint in tiling if len({y for x, y in footprint}) == 1) == 4)
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+exact_cover_test_functions = \
+    {
+        test_Get_Tilings__Full_Board,
+        test_Count_Tilings__Same_As_Brute_Force,
+    }
@@ -1,14 +1,23 @@
 #!/usr/bin/env python3
 
-from tkinter import *
+import time
+
+_start_time = time.perf_counter()
+
+from tkinter import Tk, Frame, Canvas, Label, Button, StringVar, Grid, \
+    N, S, E, W, LEFT
 
 import Board
 import Block
-import Game
 import Position
 
+import collections
 import math
 
+# Modules that are only needed for hints (Game, queue, threading) or for
+# instrumentation (json), are imported when first used.
+
+_imports_time = time.perf_counter()
 
 # Python 3.6.5
 
@@ -25,18 +34,26 @@ def build_gui(state):
     Grid.columnconfigure(root, 0, weight=1)
     grid = Frame(root)
     grid.grid(row=0, column=0, sticky=N + S + E + W)
+    for c in range(cols):
+        Grid.columnconfigure(grid, c, weight=1)
 
     main_field = build_field(state, grid, cols, rows, handle_main_field)
-    reset_colors(main_field)
+    Grid.rowconfigure(grid, 0, weight=rows)
+    main_field.canvas.grid(row=0, column=0, sticky=N + S + E + W,
+                           columnspan=cols)
     state["main_field"] = main_field
-
-    bottom = Frame(grid, bg="black")
-    bottom.grid(row=rows, sticky=N + S + E + W, columnspan=cols)
+    main_field.canvas.bind(
+        "<Motion>",
+        lambda e: handle_hover(state, get_position_at(main_field, e.x, e.y)))
+    main_field.canvas.bind("<Leave>", lambda e: handle_hover(state, None))
 
     spd = state["spawn_size"]
-    spawn_field = build_field(state, bottom, spd * 2, spd * 2,
-                              handle_spawn_field)
-    reset_colors(spawn_field)
+    spawn_field = build_field(state, grid, spd * 2, spd * 2,
+                              handle_spawn_field, cell_size=12, lazy=True)
+    Grid.rowconfigure(grid, 1, weight=1)
+    spawn_field.canvas.configure(bg="black")
+    spawn_field.canvas.grid(row=1, column=0, sticky=N + S + E + W,
+                            columnspan=cols)
     state["spawn_field"] = spawn_field
 
     col_floor = math.floor(cols / 2)
@@ -44,65 +61,278 @@ def build_gui(state):
     state["score_text"] = StringVar()
     score_lbl = Label(grid, textvariable=state["score_text"], bg="#eee",
                       fg="black")
-    score_lbl.grid(row=rows + 1, column=0, sticky=N + S + E + W,
+    score_lbl.grid(row=2, column=0, sticky=N + S + E + W,
                    columnspan=col_floor)
     state["score_text"].set("Score: 0")
 
     state["message"] = StringVar()
     msg = Label(grid, textvariable=state["message"], bg="#ffa3a3", fg="black")
-    msg.grid(row=rows + 1, column=col_floor, sticky=N + S + E + W,
+    msg.grid(row=2, column=col_floor, sticky=N + S + E + W,
              columnspan=col_floor + 1)
     state["message"].set("Good luck!")
 
+    hint_btn = Button(grid, text="Hint", command=lambda: request_hint(state))
+    hint_btn.grid(row=3, column=0, sticky=N + S + E + W, columnspan=cols)
+    root.bind("h", lambda e: request_hint(state))
+
+    state["root"] = root
     return root
 
 
-def build_field(state, grid, cols, rows, handler):
-    field = {}
-    for r in range(rows):
-        Grid.rowconfigure(grid, r, weight=1)
+class _Field:
+
+    # A grid of cells drawn as rectangles on a single canvas, keyed by their
+    # position, with (1, 1) in the bottom left corner. The colour of each cell is
+    # kept, so that only cells that actually change colour are reconfigured.
+    # The cells of a lazy field are only created when they are first coloured,
+    # and are deleted again when the field is reset.
+
+    def __init__(self, canvas, cols, rows, lazy=False):
+        self.canvas = canvas
+        self.cols   = cols
+        self.rows   = rows
+        self.lazy   = lazy
+        self.cells  = {}
+        self.colors = {}
+        self.filled = frozenset()
+        self.cell_width  = 1
+        self.cell_height = 1
+
+
+def build_field(state, parent, cols, rows, handler, cell_size=28,
+                lazy=False):
+    canvas = Canvas(parent, width=cols * cell_size, height=rows * cell_size,
+                    bg="white", highlightthickness=0)
+    field = _Field(canvas, cols, rows, lazy)
+    field.cell_width = field.cell_height = cell_size
+    if not lazy:
         for c in range(cols):
-            Grid.columnconfigure(grid, c, weight=1)
-            btn = Label(grid, state="disabled", bg="white", text="     ",
-                        borderwidth=2, relief="groove")
-            p = (c + 1, rows - r)
-            btn.bind("<Button-1>", lambda e, p=p: handler(state, p))
-            btn.grid(row=r, column=c, sticky=N + S + E + W)
-            field[p] = btn
+            for r in range(rows):
+                create_cell(field, (c + 1, rows - r), "white")
+
+    def on_click(event):
+        p = get_position_at(field, event.x, event.y)
+        if p is not None:
+            handler(state, p)
+
+    canvas.bind("<Button-1>", on_click)
+    canvas.bind("<Configure>",
+                lambda e: resize_field(field, e.width, e.height))
     return field
 
 
+def get_cell_coords(field, p):
+    c, r = p[0] - 1, field.rows - p[1]
+    return (c * field.cell_width, r * field.cell_height,
+            (c + 1) * field.cell_width, (r + 1) * field.cell_height)
+
+
+def create_cell(field, p, color):
+    field.cells[p] = field.canvas.create_rectangle(
+        *get_cell_coords(field, p), fill=color, outline="black")
+    field.colors[p] = color
+
+
+def resize_field(field, width, height):
+    field.cell_width  = max(width, field.cols) / field.cols
+    field.cell_height = max(height, field.rows) / field.rows
+    for p, cell in field.cells.items():
+        field.canvas.coords(cell, *get_cell_coords(field, p))
+
+
+def get_position_at(field, x, y):
+    c = int(x // field.cell_width)
+    r = int(y // field.cell_height)
+    if 0 <= c < field.cols and 0 <= r < field.rows:
+        return c + 1, field.rows - r
+    return None
+
+
+def set_color(field, p, color):
+    if p not in field.cells:
+        create_cell(field, p, color)
+    elif field.colors[p] != color:
+        field.canvas.itemconfigure(field.cells[p], fill=color)
+        field.colors[p] = color
+
+
 def reset_colors(field):
-    for v in field.values():
-        v.configure(bg="white", highlightbackground="black")
+    if field.lazy:
+        for cell in field.cells.values():
+            field.canvas.delete(cell)
+        field.cells.clear()
+        field.colors.clear()
+    for p, color in field.colors.items():
+        if color != "white":
+            field.canvas.itemconfigure(field.cells[p], fill="white")
+            field.colors[p] = "white"
+    field.filled = frozenset()
 
 
 def handle_main_field(state, position):
-    if not Board.can_be_dropped_at(state["board"], state["block"], position):
+    if position not in get_legal_anchors(state):
         state["message"].set(f"Cannot be dropped at {position}")
     else:
+        cancel_hint(state)
         drop_current_block(state, position)
         new_block(state)
 
-    if len(Board.get_droppable_positions(state["board"], state["block"])) <= 0:
+    if len(get_legal_anchors(state)) <= 0:
         state["score_text"].set(f"Game Over, final score: {state['score']}")
 
 
+def get_legal_anchors(state):
+    # The positions at which the current block can be dropped are computed once
+    # for each board and block, and reused for every hover event and click.
+    if state["legal_anchors"] is None:
+        state["legal_anchors"] = frozenset(
+            Board.get_droppable_positions(state["board"], state["block"]))
+    return state["legal_anchors"]
+
+
+def handle_hover(state, position):
+    state["hover"] = position
+    draw_preview(state)
+
+
+def draw_preview(state):
+    old = state["preview"]
+    state["preview"] = {}
+    position = state["hover"]
+    if position is not None and state["block"] is not None:
+        color = "green" if position in get_legal_anchors(state) else "red"
+        cells = state["main_field"].cells
+        for p in Block.get_all_dot_positions(state["block"]):
+            translated = Position.translate_over(p, *position)
+            if translated in cells:
+                state["preview"][translated] = color
+    restore_cells(state, old.keys() | state["preview"].keys())
+
+
 def handle_spawn_field(state, position):
     print(position, state)
 
 
+class _Hint:
+
+    # A search for the best position of the current block, running in a worker
+    # thread on a copy of the board. The worker only puts its progress in a
+    # queue, which is polled on the Tk thread, since tkinter must only be used
+    # from the thread running the mainloop. A cancelled search stops at the next
+    # position it values, and its remaining progress is ignored.
+
+    def __init__(self):
+        import queue
+        import threading
+        self.progress  = queue.Queue()
+        self.cancelled = threading.Event()
+        self.anchor    = None
+
+
+def request_hint(state, time_limit=5.0):
+    import threading
+    import Game
+    cancel_hint(state)
+    if state["block"] is None:
+        return
+    hint = _Hint()
+    state["hint"] = hint
+    board = Board.copy_board(state["board"])
+    block = state["block"]
+
+    def search():
+        deadline = time.monotonic() + time_limit
+        for progress in Game.search_best_move(board, block):
+            if hint.cancelled.is_set():
+                return
+            hint.progress.put(progress)
+            if time.monotonic() > deadline:
+                break
+        hint.progress.put(None)
+
+    threading.Thread(target=search, daemon=True).start()
+    state["message"].set("Hint: searching...")
+    state["root"].after(50, poll_hint, state, hint)
+
+
+def poll_hint(state, hint):
+    import queue
+    if hint.cancelled.is_set():
+        return
+    best, done = None, False
+    while True:
+        try:
+            progress = hint.progress.get_nowait()
+        except queue.Empty:
+            break
+        if progress is None:
+            done = True
+        else:
+            best = progress
+    if best is not None:
+        number, total, position, _ = best
+        show_hint(state, hint, position)
+        state["message"].set(f"Hint: searching... {number}/{total}")
+    if not done:
+        state["root"].after(50, poll_hint, state, hint)
+    elif hint.anchor is None:
+        state["message"].set("Hint: no move left")
+    else:
+        state["message"].set(f"Hint: drop at {hint.anchor}")
+
+
+def show_hint(state, hint, position):
+    if hint.anchor != position:
+        clear_hint(state, hint)
+        hint.anchor = position
+        restore_cells(state, [position])
+
+
+def clear_hint(state, hint):
+    if hint.anchor is not None:
+        anchor, hint.anchor = hint.anchor, None
+        restore_cells(state, [anchor])
+
+
+def cancel_hint(state):
+    hint = state.get("hint")
+    if hint is not None:
+        hint.cancelled.set()
+        clear_hint(state, hint)
+        state["hint"] = None
+        state["message"].set("")
+
+
+def get_cell_color(state, p):
+    # The hover preview is drawn over the hint, which is drawn over the board.
+    if p in state["preview"]:
+        return state["preview"][p]
+    hint = state["hint"]
+    if hint is not None and hint.anchor == p:
+        return "orange"
+    return "blue" if p in state["main_field"].filled else "white"
+
+
+def restore_cells(state, positions):
+    field = state["main_field"]
+    for p in positions:
+        set_color(field, p, get_cell_color(state, p))
+
+
 def drop_current_block(state, position):
-    state["score"] += Game.game_move(state["board"], state["block"], position)
+    state["score"] += Board.drop_and_clear(state["board"], state["block"],
+                                           position)[0]
     state["score_text"].set(f"Score: {state['score']}")
+    state["legal_anchors"] = None
     draw_board(state)
 
 
 def draw_board(state):
-    reset_colors(state["main_field"])
-    ps = Board.get_all_filled_positions(state["board"])
-    for p in ps:
-        state["main_field"][p].configure(bg="blue", highlightbackground="blue")
+    field = state["main_field"]
+    ps = frozenset(Board.get_all_filled_positions(state["board"]))
+    changed = field.filled ^ ps
+    field.filled = ps
+    restore_cells(state, changed)
 
 
 def draw_block(state):
@@ -111,26 +341,151 @@ def draw_block(state):
     block_poss = Block.get_all_dot_positions(block)
     for p in block_poss:
         translated = Position.translate_over(p, spd, spd)
-        state["spawn_field"][translated].configure(bg="gray",
-                                                   highlightbackground="gray")
-    anchor = state["spawn_field"][Position.translate_over((0, 0), spd, spd)]
-    anchor.configure(bg="red", highlightbackground="red")
+        set_color(state["spawn_field"], translated, "gray")
+    set_color(state["spawn_field"], Position.translate_over((0, 0), spd, spd),
+              "red")
+
+
+# Standard blocks are normalized once, when they are first drawn, so that their
+# cached footprints and dot offsets are reused by later draws.
+_normalized_blocks = {}
+
+
+def get_normalized_block(block):
+    if block not in _normalized_blocks:
+        _normalized_blocks[block] = Block.normalize(block)
+    return _normalized_blocks[block]
 
 
 def new_block(state):
     reset_colors(state["spawn_field"])
-    state["block"] = Block.normalize(Block.select_standard_block())
+    state["block"] = get_normalized_block(Block.select_standard_block())
+    state["legal_anchors"] = None
+    get_legal_anchors(state)
     draw_block(state)
+    draw_preview(state)
+
+
+instrumented_functions = ("handle_main_field", "handle_hover",
+                          "drop_current_block", "draw_board", "new_block",
+                          "draw_block")
+
+
+class _Latencies:
+
+    # Rolling windows of the most recent durations, in seconds, of each
+    # instrumented function.
+
+    def __init__(self, window):
+        self.durations = collections.defaultdict(
+            lambda: collections.deque(maxlen=window))
+
+
+def instrument(state, window=500):
+    """
+        Time each call of the instrumented functions from now on, keeping the
+        durations of the given number of most recent calls of each of them.
+        - Functions are replaced by timed versions in the module, so that calls
+          from other functions are timed as well. Handlers are bound to widgets
+          when they are built, so the GUI must be built after instrumenting.
+        - The duration of a function includes that of the functions it calls.
+    """
+    latencies = _Latencies(window)
+    state["latencies"] = latencies
+    module = globals()
+    for name in instrumented_functions:
+        module[name] = _timed(latencies.durations[name], module[name])
+
+
+def _timed(durations, function):
+    def timed(*args):
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            durations.append(time.perf_counter() - start)
+    timed.__name__ = function.__name__
+    return timed
+
+
+def get_percentiles(latencies, percentiles=(50, 90, 99)):
+    """
+        Return a dictionary mapping the name of each instrumented function that
+        was called, to a dictionary with the number of calls in its window, the
+        given percentiles of their durations and the maximum duration, all in
+        milliseconds.
+    """
+    result = {}
+    for name, durations in latencies.durations.items():
+        if len(durations) == 0:
+            continue
+        ordered = sorted(durations)
+        summary = {"count": len(ordered)}
+        for percentile in percentiles:
+            rank = max(math.ceil(percentile / 100 * len(ordered)), 1)
+            summary[f"p{percentile}"] = ordered[rank - 1] * 1000
+        summary["max"] = ordered[-1] * 1000
+        result[name] = summary
+    return result
+
+
+def dump_latencies(latencies, path):
+    import json
+    with open(path, "w") as file:
+        json.dump(get_percentiles(latencies), file, indent=2)
+
+
+def show_latencies(state, label, interval=500):
+    lines = [f"{name:<20}{summary['count']:>6}  p50 {summary['p50']:6.2f}  "
+             f"p90 {summary['p90']:6.2f}  p99 {summary['p99']:6.2f} ms"
+             for name, summary in get_percentiles(state["latencies"]).items()]
+    label.configure(text="\n".join(lines))
+    state["root"].after(interval, show_latencies, state, label, interval)
 
 
 if __name__ == '__main__':
-    board = Board.make_board(10)
+    import argparse
+    parser = argparse.ArgumentParser(description="Play 1010.")
+    parser.add_argument("-d", "--dimension", type=int, default=10)
+    parser.add_argument("--latency", action="store_true",
+                        help="time event handlers and show their percentiles")
+    parser.add_argument("--latency-file", default=None,
+                        help="write the percentiles to this file on exit")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="print the time until the window is drawn, and "
+                             "exit")
+    args = parser.parse_args()
+
+    board = Board.make_board(args.dimension)
 
     my_state = {"score": 0, "placing": False, "board": board, "block": None,
-                "message": None, "spawn_size": 6}
+                "message": None, "spawn_size": 6, "hint": None,
+                "legal_anchors": None, "hover": None, "preview": {}}
+
+    if args.latency or args.latency_file:
+        instrument(my_state)
 
     frame = build_gui(my_state)
 
+    if args.latency:
+        overlay = Label(frame, justify=LEFT, font="TkFixedFont", anchor=W)
+        overlay.grid(row=1, column=0, sticky=E + W)
+        show_latencies(my_state, overlay)
+
+    if args.latency_file:
+        def close():
+            dump_latencies(my_state["latencies"], args.latency_file)
+            frame.destroy()
+        frame.protocol("WM_DELETE_WINDOW", close)
+
     new_block(my_state)
 
-    frame.mainloop()
+    if args.startup_time:
+        imported = _imports_time - _start_time
+        frame.update()
+        drawn = time.perf_counter() - _start_time
+        print(f"Imports: {imported * 1000:.1f} ms, "
+              f"window drawn: {drawn * 1000:.1f} ms")
+        frame.destroy()
+    else:
+        frame.mainloop()
@@ -0,0 +1,120 @@
+import Block
+import Board
+import traceback
+
+
+# tests for the helpers of the GUI that do not need a display
+# - The module GUI is imported by each test, so that the other tests can run
+#   where tkinter is not installed.
+
+def test_Get_Position_At__Cells_And_Margins(score, max_score):
+    """Function get_position_at: positions under pixel coordinates."""
+    max_score.value += 2
+    try:
+        import GUI
+        field = GUI._Field(None, 4, 3)
+        field.cell_width, field.cell_height = 10, 20
+        assert GUI.get_position_at(field, 0, 0) == (1, 3)
+        assert GUI.get_position_at(field, 39.5, 59.5) == (4, 1)
+        assert GUI.get_position_at(field, 15, 25) == (2, 2)
+        for x, y in ((40, 0), (0, 60), (-1, 10), (10, -0.5)):
+            assert GUI.get_position_at(field, x, y) is None
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_Timed__Durations_Recorded(score, max_score):
+    """Function _timed: durations of calls, also of failing calls."""
+    max_score.value += 2
+    try:
+        import GUI
+        durations = []
+
+        def divide(a, b):
+            return a / b
+        timed = GUI._timed(durations, divide)
+        assert timed.__name__ == "divide"
+        assert timed(6, 3) == 2
+        try:
+            timed(1, 0)
+            assert False
+        except ZeroDivisionError:
+            pass
+        assert len(durations) == 2 and all(duration >= 0 for duration in durations)
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_Get_Percentiles__Nearest_Rank(score, max_score):
+    """Function get_percentiles: nearest-rank percentiles in milliseconds."""
+    max_score.value += 2
+    try:
+        import GUI
+        latencies = GUI._Latencies(100)
+        latencies.durations["draw_board"].extend(i / 1000 for i in range(100, 0, -1))
+        latencies.durations["new_block"].append(0.0025)
+        latencies.durations["draw_block"]
+        percentiles = GUI.get_percentiles(latencies)
+        assert set(percentiles) == {"draw_board", "new_block"}
+        summary = percentiles["draw_board"]
+        assert summary["count"] == 100
+        assert [round(summary[key], 6) for key in ("p50", "p90", "p99", "max")] == [50, 90, 99, 100]
+        assert percentiles["new_block"] == {"count": 1, "p50": 2.5, "p90": 2.5, "p99": 2.5, "max": 2.5}
+        window = GUI._Latencies(3)
+        window.durations["draw_board"].extend((1, 2, 3, 4))
+        assert GUI.get_percentiles(window, (50,))["draw_board"] == {"count": 3, "p50": 3000, "max": 4000}
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_Get_Normalized_Block__Cached(score, max_score):
+    """Function get_normalized_block: each standard block is normalized once."""
+    max_score.value += 1
+    try:
+        import GUI
+        block = Block.standard_blocks[7]
+        normalized = GUI.get_normalized_block(block)
+        assert Block.are_equivalent(normalized, Block.normalize(block))
+        assert GUI.get_normalized_block(block) is normalized
+        score.value += 1
+    except:
+        print(traceback.format_exc())
+
+
+class _Message:
+
+    def __init__(self):
+        self.text = ""
+
+    def set(self, text):
+        self.text = text
+
+
+def test_Handle_Main_Field__Rejected_Click_Keeps_Hint(score, max_score):
+    """Function handle_main_field: a click where the block cannot be dropped keeps the hint."""
+    max_score.value += 1
+    try:
+        import GUI
+        hint = object()
+        state = {"board": Board.make_board(5, {(1, 1)}),
+                 "block": GUI.get_normalized_block(Block.standard_blocks[0]),
+                 "legal_anchors": None, "hint": hint, "message": _Message(), "score": 0}
+        GUI.handle_main_field(state, (1, 1))
+        assert state["hint"] is hint
+        assert state["message"].text == "Cannot be dropped at (1, 1)"
+        score.value += 1
+    except:
+        print(traceback.format_exc())
+
+
+gui_test_functions = \
+    {
+        test_Get_Position_At__Cells_And_Margins,
+        test_Timed__Durations_Recorded,
+        test_Get_Percentiles__Nearest_Rank,
+        test_Get_Normalized_Block__Cached,
+        test_Handle_Main_Field__Rejected_Click_Keeps_Hint,
+    }
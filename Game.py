@@ -9,22 +9,6 @@ import itertools
 
 
 
-def get_score(board, block):
-    """
-    Get the score this board would give
-    """
-    score = 0
-    score_adder = 10
-    for _ in Board.get_all_filled_columns(board):
-        score += score_adder
-        score_adder += 10
-    for _ in Board.get_all_filled_rows(board):
-        score += score_adder
-        score_adder += 10
-    return score + len(block.dots)
-
-
-
 def highest_score(board, blocks, start=0):
     """
         Return the highest possible score that can be obtained by dropping
@@ -61,10 +45,7 @@ def highest_score(board, blocks, start=0):
     block = blocks[start]
     for position in Board.get_droppable_positions(board, block):
         board_copy = Board.copy_board(board)
-
-        Board.drop_at(board_copy, block, position) 
-        score = get_score(board_copy, block)
-        Board.clear_full_rows_and_columns(board_copy)
+        score = Board.drop_and_clear(board_copy, block, position)[0]
 
         score_rec, order_rec = highest_score(board_copy, blocks, start + 1)
         if score_rec is None:
@@ -119,10 +100,7 @@ def play_greedy(board, blocks):
                 best_permutation = perm
         if best_permutation is None:
             return None
-        for blk, pos in zip(best_permutation, best_result[1]):
-            assert Board.can_be_dropped_at(board, blk, pos)
-            Board.drop_at(board, blk, pos)
-            Board.clear_full_rows_and_columns(board)
+        apply_moves(board, best_permutation, best_result[1], validate=False)
         score += best_result[0]
 
     return score
@@ -143,14 +121,299 @@ def game_move(board, block, position):
         - The given block can be dropped at the given position on the given
           board.
     """
-    Board.drop_at(board, block, position)
-    nb_filled_seqs = \
-        len(Board.get_all_filled_columns(board)) + \
-        len(Board.get_all_filled_rows(board))
-    Board.clear_full_rows_and_columns(board)
-    return \
-        len(Block.get_all_dot_positions(block)) + \
-        10 * ((nb_filled_seqs + 1) * nb_filled_seqs) // 2
+    return Board.drop_and_clear(board, block, position)[0]
+
+
+# Standard blocks as dropped during a game, i.e. with their anchor on one of
+# their dots. They are normalized once, so that their cached footprints are
+# shared by all games.
+normalized_standard_blocks = tuple(Block.normalize(block) for block in Block.standard_blocks)
+
+
+class GameSession:
+    """
+        A game on a square board, fed by a seeded random stream of standard
+        blocks, that is played without any input or output.
+        - The session keeps the board, the index in Block.standard_blocks of the
+          block to drop next, the block itself (normalized), the score and the
+          number of moves played so far.
+        - The history of the session lists a tuple of the block index, the
+          position and the score of each move played so far.
+        - Blocks are drawn from a block source made by Block.make_block_source
+          with the given seed, stream and weights, so that sessions with the same
+          seed see the same sequence of blocks.
+    """
+
+    def __init__(self, dimension=10, seed=None, positions_to_fill=frozenset(),
+                 stream=0, weights=None):
+        self.dimension = dimension
+        self.positions_to_fill = frozenset(positions_to_fill)
+        self.stream  = stream
+        self.weights = weights
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """
+            Start a new game on a board in its initial state, with blocks drawn
+            from a new block source seeded with the given seed.
+            - The function returns the first block to drop.
+        """
+        self.board  = Board.make_board(self.dimension, self.positions_to_fill)
+        self.source = Block.make_block_source(seed, self.stream, self.weights)
+        self.score  = 0
+        self.moves  = 0
+        self.history = []
+        self.next_block()
+        return self.block
+
+    def next_block(self):
+        self.block_index = Block.draw_block_index(self.source)
+        self.block = normalized_standard_blocks[self.block_index]
+        self._legal_moves = None
+
+    def legal_moves(self):
+        """
+            Return a list of all positions at which the current block can be
+            dropped, in the order of Board.get_droppable_positions.
+            - The list is computed once per board state and must not be modified.
+        """
+        if self._legal_moves is None:
+            self._legal_moves = Board.get_droppable_positions(self.board, self.block)
+        return self._legal_moves
+
+    def legal_move_mask(self):
+        """
+            Return a list of dimension*dimension booleans indicating for each cell
+            whether the current block can be dropped with its anchor on that cell.
+            - The entry for the cell at position (x, y) is at index
+              (x - 1) * dimension + (y - 1). Reshaped to dimension rows of
+              dimension entries, the mask thus has the layout of the boards and
+              masks of Simulator.GameBatch and of the boards of Corpus: the cell
+              at position (x, y) is at index [x - 1, y - 1].
+        """
+        mask = [False] * (self.dimension * self.dimension)
+        for x, y in self.legal_moves():
+            mask[(x - 1) * self.dimension + (y - 1)] = True
+        return mask
+
+    def is_over(self):
+        """
+            Check whether the game is over, i.e. whether the current block
+            cannot be dropped anywhere on the board.
+        """
+        return len(self.legal_moves()) == 0
+
+    def step(self, position):
+        """
+            Drop the current block at the given position, clear all full rows and
+            columns and draw the next block.
+            - The function returns the score obtained from the move.
+            - Nothing happens and None is returned if the current block cannot be
+              dropped at the given position.
+        """
+        result = Board.drop_and_clear(self.board, self.block, position)
+        if result is None:
+            return None
+        move_score = result[0]
+        self.score += move_score
+        self.moves += 1
+        self.history.append((self.block_index, position, move_score))
+        self.next_block()
+        return move_score
+
+
+def apply_moves(board, blocks, positions, validate=True):
+    """
+        Drop each block of the given sequence of blocks at the corresponding position
+        in the given sequence of positions on the given board, in the order from left
+        to right, and clear all full rows and columns after each drop.
+        - The function returns a tuple of the list of the scores obtained from the
+          successive moves, followed by the given board.
+        - If validate is true and some block cannot be dropped at its position, the
+          function stops at that block. The list of scores then only holds the
+          scores of the preceding moves.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+        - The given sequences of blocks and positions have the same length.
+        - If validate is false, each block can be dropped at its position on the
+          board resulting from the preceding moves.
+    """
+    scores = []
+    for block, position in zip(blocks, positions):
+        result = Board.drop_and_clear(board, block, position, validate)
+        if result is None:
+            break
+        scores.append(result[0])
+    return scores, board
+
+
+def search_best_move(board, block, next_blocks=normalized_standard_blocks):
+    """
+        Return an iterator over the progress of a search for the best position to
+        drop the given block on the given board, looking one block ahead.
+        - Each position at which the block can be dropped is valued at the score
+          of dropping the block there, plus the average over the given next blocks
+          of the highest score for dropping that block alone on the resulting
+          board. Next blocks that cannot be dropped add nothing to that average.
+        - After each position has been valued, the iterator yields a tuple of the
+          number of positions valued so far, the total number of positions, the
+          best position so far and its value. Of several positions with the same
+          value, the first in the order of Board.get_droppable_positions is best.
+        - Nothing is yielded if the block cannot be dropped on the board.
+        - The search can be stopped at any time by no longer iterating over it.
+          The given board is left untouched.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given block and each of the given next blocks are proper blocks.
+    """
+    positions = Board.get_droppable_positions(board, block)
+    best_position, best_value = None, None
+    for number, position in enumerate(positions):
+        board_copy = Board.copy_board(board)
+        value = Board.drop_and_clear(board_copy, block, position)[0]
+        if len(next_blocks) > 0:
+            total = 0
+            for next_block in next_blocks:
+                next_score, _ = highest_score(board_copy, [next_block])
+                if next_score is not None:
+                    total += next_score
+            value += total / len(next_blocks)
+        if best_value is None or value > best_value:
+            best_position, best_value = position, value
+        yield number + 1, len(positions), best_position, best_value
+
+
+def random_strategy(session, generator):
+    """
+        Return a position, chosen with the given random generator, at which the
+        current block of the given game session can be dropped.
+    """
+    return generator.choice(session.legal_moves())
+
+
+def greedy_strategy(session, generator):
+    """
+        Return the position at which dropping the current block of the given game
+        session yields the highest score, as found by highest_score.
+    """
+    return highest_score(session.board, [session.block])[1][0]
+
+
+def lookahead_strategy(session, generator):
+    """
+        Return the best position for the current block of the given game session,
+        as found by search_best_move.
+    """
+    for _, _, position, _ in search_best_move(session.board, session.block):
+        pass
+    return position
+
+
+# Strategies by name, for the command line of this module and for Tournament.
+strategies = {
+    "random": random_strategy,
+    "greedy": greedy_strategy,
+    "lookahead": lookahead_strategy,
+}
+
+
+def read_script(lines):
+    """
+        Return a tuple of the seed and the list of positions in the move script
+        with the given lines.
+        - Each line of a script holds a position, written as "x y", "x,y" or
+          "(x, y)", or the seed of the game, written as "seed" followed by the
+          seed. Empty lines and lines starting with "#" are skipped.
+        - The seed is None if the script does not hold one.
+        - A ValueError is raised for lines that cannot be read.
+    """
+    seed, positions = None, []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+        words = line.replace("(", " ").replace(")", " ").replace(",", " ").split()
+        try:
+            if words[0] == "seed" and len(words) == 2:
+                seed = int(words[1])
+            elif len(words) == 2:
+                positions.append((int(words[0]), int(words[1])))
+            else:
+                raise ValueError
+        except ValueError:
+            raise ValueError("Line {} of the script cannot be read: {}".format(number, line)) from None
+    return seed, positions
+
+
+def make_script_strategy(positions):
+    """
+        Return a strategy that plays the given positions, one per move, and
+        returns None once all of them are played.
+    """
+    positions = iter(positions)
+    return lambda session, generator: next(positions, None)
+
+
+def render_session(session, viewport=None):
+    """
+        Return a frame showing the board of the given game session within the
+        given viewport, as rendered by Board.render_board, followed by the score
+        and the next block to drop.
+        - Frames of the same board and viewport have the same number of lines, so
+          that successive frames can be redrawn line by line.
+    """
+    block_lines = Block.render_block(session.block).splitlines()
+    block_lines += [""] * (5 - len(block_lines))
+    return Board.render_board(session.board, viewport) + \
+        "\nScore: {}   Moves: {}\nNext block to drop:\n".format(session.score, session.moves) + \
+        "\n".join(block_lines) + "\n"
+
+
+def play_batch(session, strategy, generator, out, log=False, watch=None):
+    """
+        Play the game of the given game session without prompting, dropping each
+        block at the position returned by the given strategy, called with the
+        session and the given random generator.
+        - The game is played until it is over, until the strategy returns None
+          or until the strategy returns a position at which the block cannot be
+          dropped. The function returns "game over", "end of script" or
+          "illegal move" accordingly.
+        - If log is true, a line in JSON is written to the given output for each
+          move and for the final result. Otherwise, only a summary of the final
+          result is written.
+        - If a function to watch the game is given, it is called with the session
+          before the first move and after each move.
+    """
+    import json
+    if watch is not None:
+        watch(session)
+    while True:
+        if session.is_over():
+            result = "game over"
+            break
+        position = strategy(session, generator)
+        if position is None:
+            result = "end of script"
+            break
+        block_index = session.block_index
+        move_score = session.step(position)
+        if move_score is None:
+            result = "illegal move"
+            break
+        if log:
+            out.write(json.dumps({"move": session.moves, "block": block_index,
+                                  "position": list(position), "score": move_score,
+                                  "total": session.score}) + "\n")
+        if watch is not None:
+            watch(session)
+    if log:
+        out.write(json.dumps({"result": result, "moves": session.moves,
+                              "score": session.score}) + "\n")
+    else:
+        out.write("Result: {}\nMoves: {}\nFinal score: {}\n".format(
+            result, session.moves, session.score))
+    return result
 
 
 def play_game():
@@ -202,4 +465,62 @@ def play_game():
 
 
 if __name__ == '__main__':
-    play_game()
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(
+        description="Play 1010 interactively, or without prompting from a move "
+                    "script or with a strategy.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--script", help='file with the moves to play, "-" for stdin')
+    source.add_argument("--strategy", choices=sorted(strategies))
+    parser.add_argument("-d", "--dimension", type=int, default=5)
+    parser.add_argument("-s", "--seed", type=int, default=None,
+                        help="seed of the blocks, overriding that of the script")
+    parser.add_argument("--log", action="store_true",
+                        help="write a line in JSON for each move and the result")
+    parser.add_argument("--watch", action="store_true",
+                        help="redraw the game after each move on an ANSI terminal")
+    parser.add_argument("--viewport", default=None,
+                        help='part of the board to show, as "left,bottom,columns,rows"')
+    args = parser.parse_args()
+
+    if args.script is None and args.strategy is None:
+        play_game()
+        sys.exit()
+
+    seed = args.seed
+    if args.script is not None:
+        try:
+            if args.script == "-":
+                script_seed, positions = read_script(sys.stdin)
+            else:
+                with open(args.script) as file:
+                    script_seed, positions = read_script(file)
+        except ValueError as error:
+            parser.error(str(error))
+        if seed is None:
+            seed = script_seed
+        if seed is None:
+            parser.error('the script holds no "seed" line and no --seed is given, '
+                         'so its moves would be played against random blocks')
+        strategy = make_script_strategy(positions)
+    else:
+        strategy = strategies[args.strategy]
+    viewport = None
+    if args.viewport is not None:
+        try:
+            viewport = tuple(int(number) for number in args.viewport.split(","))
+        except ValueError:
+            viewport = ()
+        if len(viewport) != 4 or viewport[2] < 1 or viewport[3] < 1:
+            parser.error('--viewport must be "left,bottom,columns,rows", '
+                         'with at least one column and one row, not "{}"'.format(args.viewport))
+    with open(sys.stdout.fileno(), "w", buffering=1 << 16, closefd=False) as out:
+        watch = None
+        if args.watch:
+            import Terminal
+            terminal = Terminal.make_terminal(out)
+            watch = lambda session: Terminal.draw_frame(terminal, render_session(session, viewport))
+        result = play_batch(GameSession(args.dimension, seed), strategy,
+                            random.Random(seed), out, args.log, watch)
+    sys.exit(1 if result == "illegal move" else 0)
@@ -1,6 +1,9 @@
 import Block
 import Board
 import Game
+import io
+import json
+import random
 import traceback
 
 
@@ -391,6 +394,190 @@ def test_play_greedy__Larger_Sequence_Blocks(score, max_score):
         print(traceback.format_exc())
 
 
+# tests for GameSession
+
+def test_GameSession__Reproducible_Game(score, max_score):
+    """Class GameSession: same seed gives the same game, moves match game_move."""
+    max_score.value += 5
+    try:
+        session = Game.GameSession(6, seed=42)
+        other_session = Game.GameSession(6, seed=42)
+        the_board = Board.make_board(6)
+        total = 0
+        while not session.is_over():
+            assert session.block_index == other_session.block_index
+            legal_moves = session.legal_moves()
+            mask = session.legal_move_mask()
+            assert sum(mask) == len(legal_moves)
+            for x, y in legal_moves:
+                assert mask[(x - 1) * 6 + (y - 1)]
+            position = legal_moves[len(legal_moves) // 2]
+            expected = Game.game_move(the_board, session.block, position)
+            assert session.step(position) == expected
+            assert other_session.step(position) == expected
+            total += expected
+            assert Board.get_all_filled_positions(session.board) == \
+                   Board.get_all_filled_positions(the_board)
+        assert session.score == other_session.score == total
+        assert session.step((1, 1)) is None
+        session.reset(42)
+        assert session.score == 0 and session.moves == 0
+        assert Board.get_all_filled_positions(session.board) == set()
+        score.value += 5
+    except:
+        print(traceback.format_exc())
+
+
+# tests for apply_moves
+
+def test_apply_moves__Same_As_Game_Move(score, max_score):
+    """Function apply_moves: same scores and board as successive game moves."""
+    max_score.value += 3
+    try:
+        positions_to_fill = {(1, 2), (2, 2), (3, 2), (5, 5)}
+        generator = random.Random(7)
+        the_board = Board.make_board(5, positions_to_fill)
+        blocks, positions, expected = [], [], []
+        for _ in range(8):
+            block = generator.choice(Block.standard_blocks)
+            droppable = Board.get_droppable_positions(the_board, block)
+            if len(droppable) == 0:
+                continue
+            blocks.append(block)
+            positions.append(generator.choice(droppable))
+            expected.append(Game.game_move(the_board, block, positions[-1]))
+        for validate in (True, False):
+            other_board = Board.make_board(5, positions_to_fill)
+            scores, result = Game.apply_moves(other_board, blocks, positions, validate)
+            assert result is other_board
+            assert scores == expected
+            assert Board.get_all_filled_positions(other_board) == \
+                   Board.get_all_filled_positions(the_board)
+        other_board = Board.make_board(5, positions_to_fill)
+        scores, _ = Game.apply_moves(other_board, blocks[:2] + blocks[:2], positions[:2] * 2)
+        assert scores == expected[:2]
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+# tests for search_best_move
+
+def test_search_best_move__No_Lookahead(score, max_score):
+    """Function search_best_move: without next blocks, same as highest_score."""
+    max_score.value += 2
+    try:
+        the_board = Board.make_board(5, {(1, 1), (2, 1), (3, 1), (4, 1), (5, 2), (5, 3)})
+        block = Block.make_block({(0, 0), (1, 0)})
+        progress = list(Game.search_best_move(the_board, block, ()))
+        nb_positions = len(Board.get_droppable_positions(the_board, block))
+        assert [number for number, _, _, _ in progress] == list(range(1, nb_positions + 1))
+        assert all(total == nb_positions for _, total, _, _ in progress)
+        best_score, best_positions = Game.highest_score(the_board, [block])
+        assert progress[-1][2:] == (best_positions[0], best_score)
+        assert len(Board.get_all_filled_positions(the_board)) == 6
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_search_best_move__Lookahead(score, max_score):
+    """Function search_best_move: looking one block ahead."""
+    max_score.value += 3
+    try:
+        # Dropping the vertical block at (2, 2) clears a column, but dropping it
+        # at (3, 1) clears a row and leaves room to clear 2 more lines next.
+        the_board = Board.make_board(3, {(1, 1), (1, 2), (2, 1)})
+        block = Block.make_block({(0, 0), (0, 1)})
+        next_block = Block.make_block({(0, 0), (0, 1), (0, 2)})
+        progress = list(Game.search_best_move(the_board, block, [next_block]))
+        assert progress[0] == (1, 3, (2, 2), 12 + 13)
+        assert progress[-1] == (3, 3, (3, 1), 12 + 33)
+        assert list(Game.search_best_move(Board.make_board(1, {(1, 1)}), block)) == []
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+# tests for read_script and play_batch
+
+def test_read_script__Seed_And_Positions(score, max_score):
+    """Function read_script: seed, positions, comments and invalid lines."""
+    max_score.value += 2
+    try:
+        lines = ["# a script", "seed 12", "", "1 2", "(3, 4)", "  5,6  "]
+        assert Game.read_script(lines) == (12, [(1, 2), (3, 4), (5, 6)])
+        assert Game.read_script(["1 1"]) == (None, [(1, 1)])
+        try:
+            Game.read_script(["1 1", "1 2 3"])
+            assert False
+        except ValueError:
+            pass
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_play_batch__Replay_Script(score, max_score):
+    """Function play_batch: a script replays a game with the same seed."""
+    max_score.value += 4
+    try:
+        out = io.StringIO()
+        session = Game.GameSession(5, 21)
+        result = Game.play_batch(session, Game.random_strategy, random.Random(3), out)
+        assert result == "game over"
+        assert out.getvalue() == "Result: game over\nMoves: {}\nFinal score: {}\n".format(
+            session.moves, session.score)
+        positions = [position for _, position, _ in session.history]
+        out = io.StringIO()
+        replayed = Game.GameSession(5, 21)
+        strategy = Game.make_script_strategy(positions[:-1])
+        assert Game.play_batch(replayed, strategy, None, out, log=True) == "end of script"
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert len(lines) == len(positions)
+        assert [tuple(line["position"]) for line in lines[:-1]] == positions[:-1]
+        assert [line["score"] for line in lines[:-1]] == \
+               [move_score for _, _, move_score in session.history[:-1]]
+        assert lines[-1] == {"result": "end of script", "moves": len(positions) - 1,
+                             "score": lines[-2]["total"]}
+        score.value += 4
+    except:
+        print(traceback.format_exc())
+
+
+def test_play_batch__Illegal_Move(score, max_score):
+    """Function play_batch: the game stops at an illegal move."""
+    max_score.value += 1
+    try:
+        session = Game.GameSession(5, 0, {(1, 1)})
+        out = io.StringIO()
+        strategy = Game.make_script_strategy([(1, 1)])
+        assert Game.play_batch(session, strategy, None, out) == "illegal move"
+        assert session.moves == 0
+        score.value += 1
+    except:
+        print(traceback.format_exc())
+
+
+# tests for render_session
+
+def test_render_session__Same_Number_Of_Lines(score, max_score):
+    """Function render_session: frames of a game have the same number of lines."""
+    max_score.value += 1
+    try:
+        session = Game.GameSession(6, 8)
+        nb_lines = set()
+        while not session.is_over():
+            frame = Game.render_session(session, (1, 2, 6, 4))
+            assert frame.startswith(Board.render_board(session.board, (1, 2, 6, 4)))
+            nb_lines.add(len(frame.splitlines()))
+            session.step(session.legal_moves()[0])
+        assert nb_lines == {5 + 3 + 5}
+        score.value += 1
+    except:
+        print(traceback.format_exc())
+
+
 game_test_functions = \
     {
         test_play_greedy__Empty_List,
@@ -414,4 +601,14 @@ game_test_functions = \
         test_highest_score__4_Blocks_Possible_Solution2,
         test_highest_score__Several_Blocks_No_Solution,
         test_highest_score__Larger_Sequence_Blocks,
+
+        test_GameSession__Reproducible_Game,
+
+        test_apply_moves__Same_As_Game_Move,
+        test_search_best_move__No_Lookahead,
+        test_search_best_move__Lookahead,
+        test_read_script__Seed_And_Positions,
+        test_play_batch__Replay_Script,
+        test_play_batch__Illegal_Move,
+        test_render_session__Same_Number_Of_Lines,
     }
@@ -1,5 +1,3 @@
-import random
-
 # Positions are used to
 #  (1) identify cells on the board
 #  (2) dots on blocks relative to the block's anchor.
@@ -40,6 +38,112 @@ def is_proper_position_for_board(dimension, position):
 
 
 
+# Positions on a board with a given dimension can also be encoded as flat
+# integer cell indices x + y*stride, with stride equal to dimension + 1. The
+# extra column keeps cells at the left and right edge of the board apart, so
+# that no neighbour of a cell wraps around to the other side of the board.
+
+
+class _NeighbourTables:
+
+    def __init__(self, dimension):
+        self.dimension = dimension
+        self.stride    = stride = dimension + 1
+        size = (dimension + 1) * stride
+        self.positions = [None] * size
+        self.adjacent_positions    = [frozenset()] * size
+        self.surrounding_positions = [frozenset()] * size
+        for y in range(1, dimension + 1):
+            for x in range(1, dimension + 1):
+                self.positions[x + y * stride] = (x, y)
+        for y in range(1, dimension + 1):
+            for x in range(1, dimension + 1):
+                index = x + y * stride
+                self.adjacent_positions[index] = frozenset(
+                    (x + i, y + j) for i, j in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                    if 1 <= x + i <= dimension and 1 <= y + j <= dimension
+                )
+                self.surrounding_positions[index] = frozenset(
+                    (x + i, y + j) for j in (-1, 0, 1) for i in (-1, 0, 1)
+                    if (i != 0 or j != 0) and 1 <= x + i <= dimension and 1 <= y + j <= dimension
+                )
+
+
+_neighbour_tables = {}
+
+
+def get_neighbour_tables(dimension):
+    """
+        Return the precomputed neighbour tables for a board with the given dimension.
+        - The tables are lists indexed by cell index. The list positions maps each
+          cell index back to its position, or to None for indices that are not a
+          cell. The lists adjacent_positions and surrounding_positions hold frozen
+          sets of the neighbouring positions of each cell within the board.
+        - The tables are built once per dimension and shared afterwards. They must
+          not be modified.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+    """
+    tables = _neighbour_tables.get(dimension)
+    if tables is None:
+        tables = _neighbour_tables[dimension] = _NeighbourTables(dimension)
+    return tables
+
+
+
+
+def to_index(dimension, position):
+    """
+        Return the cell index of the given position on a board with the given
+        dimension.
+        ASSUMPTIONS
+        - The given position is a proper position for a board with the given
+          dimension.
+    """
+    x, y = position
+    return x + y * (dimension + 1)
+
+
+
+
+def to_position(dimension, index):
+    """
+        Return the position of the cell with the given index on a board with the
+        given dimension.
+        ASSUMPTIONS
+        - The given index is a cell index for a board with the given dimension.
+    """
+    return get_neighbour_tables(dimension).positions[index]
+
+
+
+
+def is_proper_index_for_board(dimension, index):
+    """
+        Check whether the given index is the index of a cell on a board with the
+        given dimension.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+    """
+    positions = get_neighbour_tables(dimension).positions
+    return type(index) is int and 0 <= index < len(positions) and positions[index] is not None
+
+
+
+
+def translate_index(dimension, index, delta_x, delta_y):
+    """
+        Return the index resulting from translating the cell with the given index
+        horizontally and vertically over the given delta's.
+        ASSUMPTIONS
+        - The given index is a cell index for a board with the given dimension.
+        - The resulting position is within the boundaries of that board.
+    """
+    return index + delta_x + delta_y * (dimension + 1)
+
+
+
+
 def left(dimension, position):
     """
         Return the position on any board with the given dimension immediately to
@@ -156,9 +260,11 @@ def get_adjacent_positions(position, dimension=None):
           given dimension, or simply a proper position if no dimension is supplied.
     """
     x, y = position
-
     if dimension is None:
         return {(x-1,y), (x+1,y), (x,y-1), (x,y+1)}
+    if 1 <= x <= dimension and 1 <= y <= dimension:
+        tables = get_neighbour_tables(dimension)
+        return set(tables.adjacent_positions[x + y * tables.stride])
 
     s = set()
     if x > 1:
@@ -183,7 +289,12 @@ def is_adjacent_to(position, other_positions):
         ASSUMPTIONS
         - The given position is a proper position
         - All positions in the collection of other positions are proper positions.
+        NOTE
+        - A neighbour index made by make_neighbour_index can be given as the
+          collection of other positions to answer the question in constant time.
     """
+    if type(other_positions) is _NeighbourIndex:
+        return other_positions.adjacent.get(position, 0) > 0
     x, y = position
     s = {(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)}
     return len(s & set(other_positions)) > 0
@@ -204,16 +315,211 @@ def get_surrounding_positions(position, dimension=None):
           given dimension, or simply a proper position if no dimension is supplied.
     """
     x, y = position
-    surrounding = {(x+i,y+j) for i in (-1,0,1) for j in (-1,0,1) if i != 0 or j != 0}
     if dimension is None:
-        return surrounding
-    not_surrounding = {
-            p for p in surrounding
-            if p[0] < 1 or p[0] > dimension or \
-                p[1] < 1 or p[1] > dimension
-        }
-
-    return surrounding - not_surrounding
+        return {(x+i,y+j) for i in (-1,0,1) for j in (-1,0,1) if i != 0 or j != 0}
+    if 1 <= x <= dimension and 1 <= y <= dimension:
+        tables = get_neighbour_tables(dimension)
+        return set(tables.surrounding_positions[x + y * tables.stride])
+    return {(x+i,y+j) for i in (-1,0,1) for j in (-1,0,1)
+            if (i != 0 or j != 0) and 1 <= x+i <= dimension and 1 <= y+j <= dimension}
+
+
+
+
+class _NeighbourIndex:
+
+    def __init__(self):
+        self.positions   = set()
+        self.adjacent    = {}
+        self.surrounding = {}
+
+    def update_counts(self, position, change):
+        x, y = position
+        for counts, offsets in ((self.adjacent, _adjacent_offsets),
+                                (self.surrounding, _surrounding_offsets)):
+            for i, j in offsets:
+                neighbour = (x + i, y + j)
+                count = counts.get(neighbour, 0) + change
+                if count == 0:
+                    del counts[neighbour]
+                else:
+                    counts[neighbour] = count
+
+
+_adjacent_offsets    = ((-1, 0), (1, 0), (0, -1), (0, 1))
+_surrounding_offsets = tuple((i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if i != 0 or j != 0)
+
+
+def make_neighbour_index(positions=frozenset()):
+    """
+        Return a new neighbour index involving all positions in the given
+        collection of positions.
+        - A neighbour index keeps, for every position, the number of indexed
+          positions adjacent to it and surrounding it. Queries on the index
+          take constant time, regardless of the number of indexed positions.
+        ASSUMPTIONS
+        - Each position in the given collection of positions is a proper position.
+    """
+    neighbour_index = _NeighbourIndex()
+    for position in positions:
+        insert_position(neighbour_index, position)
+    return neighbour_index
+
+
+
+
+def insert_position(neighbour_index, position):
+    """
+        Add the given position to the given neighbour index.
+        - Nothing happens if the given position is already in the index.
+        ASSUMPTIONS
+        - The given position is a proper position.
+    """
+    if position not in neighbour_index.positions:
+        neighbour_index.positions.add(position)
+        neighbour_index.update_counts(position, 1)
+
+
+
+
+def remove_position(neighbour_index, position):
+    """
+        Remove the given position from the given neighbour index.
+        - Nothing happens if the given position is not in the index.
+        ASSUMPTIONS
+        - The given position is a proper position.
+    """
+    if position in neighbour_index.positions:
+        neighbour_index.positions.remove(position)
+        neighbour_index.update_counts(position, -1)
+
+
+
+
+def count_adjacent(neighbour_index, position):
+    """
+        Return the number of positions in the given neighbour index that are
+        adjacent to the given position in an unbounded area.
+        ASSUMPTIONS
+        - The given position is a proper position.
+    """
+    return neighbour_index.adjacent.get(position, 0)
+
+
+
+
+def count_surrounding(neighbour_index, position):
+    """
+        Return the number of positions in the given neighbour index that are
+        surrounding the given position in an unbounded area.
+        ASSUMPTIONS
+        - The given position is a proper position.
+    """
+    return neighbour_index.surrounding.get(position, 0)
+
+
+
+
+# Batch variants of the position functions above work on NumPy arrays of
+# shape (N, 2), holding one position per row. NumPy is only needed by these
+# functions and is therefore imported by each of them.
+
+def is_proper_position_for_board_batch(dimension, positions):
+    """
+        Return a boolean array of shape (N,) indicating for each position in the
+        given array whether it is a proper position for a square board with the
+        given dimension.
+        - The result for each position is the same as the result of the function
+          is_proper_position_for_board for that position as a tuple of integers.
+        - All positions are improper if the given array does not have an integer
+          type or if the given dimension is not an integer number.
+        ASSUMPTIONS
+        - The given positions are an array of shape (N, 2).
+    """
+    import numpy
+    positions = numpy.asarray(positions)
+    if type(dimension) is not int or not numpy.issubdtype(positions.dtype, numpy.integer):
+        return numpy.zeros(len(positions), dtype=bool)
+    return ((positions >= 1) & (positions <= dimension)).all(axis=1)
+
+
+
+
+def translate_over_batch(positions, delta_x, delta_y):
+    """
+        Return a new array of the positions resulting from translating each of
+        the given positions horizontally and vertically over the given delta's.
+        ASSUMPTIONS
+        - The given positions are an integer array of shape (N, 2).
+        - The given delta's are integer numbers.
+    """
+    import numpy
+    return numpy.asarray(positions) + numpy.array((delta_x, delta_y))
+
+
+
+
+def to_index_batch(dimension, positions):
+    """
+        Return an integer array of shape (N,) with the cell index of each of the
+        given positions on a board with the given dimension.
+        ASSUMPTIONS
+        - The given positions are an integer array of shape (N, 2) of proper
+          positions for a board with the given dimension.
+    """
+    import numpy
+    positions = numpy.asarray(positions)
+    return positions[:, 0] + positions[:, 1] * (dimension + 1)
+
+
+
+
+def _get_neighbours_batch(positions, offsets, dimension):
+    import numpy
+    neighbours = numpy.asarray(positions)[:, None, :] + numpy.array(offsets)
+    if dimension is None:
+        valid = numpy.ones(neighbours.shape[:2], dtype=bool)
+    else:
+        valid = ((neighbours >= 1) & (neighbours <= dimension)).all(axis=2)
+    return neighbours, valid
+
+
+
+
+def get_adjacent_positions_batch(positions, dimension=None):
+    """
+        Return the positions adjacent to each of the given positions.
+        - The function returns a tuple of an array of shape (N, 4, 2) with the
+          4 candidate adjacent positions of each given position, followed by a
+          boolean array of shape (N, 4) marking the candidates that are within
+          the boundaries of a board with the given dimension.
+        - For each given position, the marked candidates are exactly the
+          positions in the set returned by get_adjacent_positions.
+        - If the given dimension is None, all candidates are marked.
+        ASSUMPTIONS
+        - The given positions are an integer array of shape (N, 2) of proper
+          positions for a board with the given dimension.
+    """
+    return _get_neighbours_batch(positions, _adjacent_offsets, dimension)
+
+
+
+
+def get_surrounding_positions_batch(positions, dimension=None):
+    """
+        Return the positions surrounding each of the given positions.
+        - The function returns a tuple of an array of shape (N, 8, 2) with the
+          8 candidate surrounding positions of each given position, followed by
+          a boolean array of shape (N, 8) marking the candidates that are within
+          the boundaries of a board with the given dimension.
+        - For each given position, the marked candidates are exactly the
+          positions in the set returned by get_surrounding_positions.
+        - If the given dimension is None, all candidates are marked.
+        ASSUMPTIONS
+        - The given positions are an integer array of shape (N, 2) of proper
+          positions for a board with the given dimension.
+    """
+    return _get_neighbours_batch(positions, _surrounding_offsets, dimension)
 
 
 
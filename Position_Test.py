@@ -522,6 +522,111 @@ def test_Are_Chained_Rec__Touching_Positions(score, max_score):
         print(traceback.format_exc())
 
 
+# Tests for the cell index encoding
+
+def test_To_Index__Round_Trip(score, max_score):
+    """Functions to_index and to_position: round trip over all cells of a board."""
+    max_score.value += 1
+    try:
+        indices = set()
+        for x in range(1, 8):
+            for y in range(1, 8):
+                index = Position.to_index(7, (x, y))
+                assert Position.is_proper_index_for_board(7, index)
+                assert Position.to_position(7, index) == (x, y)
+                indices.add(index)
+        assert len(indices) == 49
+        assert not Position.is_proper_index_for_board(7, 0)
+        assert not Position.is_proper_index_for_board(7, Position.to_index(7, (1, 1)) - 1)
+        assert not Position.is_proper_index_for_board(7, -5)
+        score.value += 1
+    except:
+        print(traceback.format_exc())
+
+
+def test_Neighbour_Tables__Match_Position_Functions(score, max_score):
+    """Function get_neighbour_tables: tables match the position based functions."""
+    max_score.value += 2
+    try:
+        tables = Position.get_neighbour_tables(5)
+        assert Position.get_neighbour_tables(5) is tables
+        for x in range(1, 6):
+            for y in range(1, 6):
+                index = Position.to_index(5, (x, y))
+                assert tables.positions[index] == (x, y)
+                assert tables.adjacent_positions[index] == \
+                       {(x + i, y + j) for (i, j) in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                        if 1 <= x + i <= 5 and 1 <= y + j <= 5}
+                assert tables.surrounding_positions[index] == \
+                       {(x + i, y + j) for i in (-1, 0, 1) for j in (-1, 0, 1)
+                        if (i, j) != (0, 0) and 1 <= x + i <= 5 and 1 <= y + j <= 5}
+        assert tables.positions.count(None) == 6 * 6 - 5 * 5
+        assert Position.translate_index(5, Position.to_index(5, (2, 3)), 2, -1) == \
+               Position.to_index(5, (4, 2))
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+# Tests for the batch variants
+
+def test_Batch_Functions__Match_Scalar_Functions(score, max_score):
+    """Batch position functions: same results as the scalar functions."""
+    max_score.value += 3
+    try:
+        import numpy
+        positions = [(x, y) for x in range(-1, 8) for y in range(-1, 8)]
+        array = numpy.array(positions)
+        proper = Position.is_proper_position_for_board_batch(6, array)
+        assert [bool(b) for b in proper] == \
+               [Position.is_proper_position_for_board(6, p) for p in positions]
+        assert not Position.is_proper_position_for_board_batch(6, array.astype(float)).any()
+        assert not Position.is_proper_position_for_board_batch(6.0, array).any()
+        translated = Position.translate_over_batch(array, 2, -3)
+        assert [tuple(map(int, p)) for p in translated] == \
+               [Position.translate_over(p, 2, -3) for p in positions]
+        inside = array[proper]
+        for function, batch_function in \
+                ((Position.get_adjacent_positions, Position.get_adjacent_positions_batch),
+                 (Position.get_surrounding_positions, Position.get_surrounding_positions_batch)):
+            for dimension in (None, 6):
+                neighbours, valid = batch_function(inside, dimension)
+                for position, row, mask in zip(inside, neighbours, valid):
+                    position = tuple(map(int, position))
+                    assert {tuple(map(int, p)) for p in row[mask]} == function(position, dimension)
+        assert [int(i) for i in Position.to_index_batch(6, inside)] == \
+               [Position.to_index(6, tuple(map(int, p))) for p in inside]
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+# Tests for the neighbour index
+
+def test_Neighbour_Index__Match_Position_Functions(score, max_score):
+    """Function make_neighbour_index: queries match the position based functions."""
+    max_score.value += 2
+    try:
+        positions = {(1, 1), (2, 1), (4, 4), (-1, 3), (3, 2)}
+        neighbour_index = Position.make_neighbour_index(positions)
+        Position.insert_position(neighbour_index, (6, 6))
+        Position.insert_position(neighbour_index, (6, 6))
+        Position.remove_position(neighbour_index, (4, 4))
+        Position.remove_position(neighbour_index, (9, 9))
+        positions = (positions | {(6, 6)}) - {(4, 4)}
+        for x in range(-3, 9):
+            for y in range(-3, 9):
+                assert Position.is_adjacent_to((x, y), neighbour_index) == \
+                       Position.is_adjacent_to((x, y), positions)
+                assert Position.count_adjacent(neighbour_index, (x, y)) == \
+                       len(Position.get_adjacent_positions((x, y)) & positions)
+                assert Position.count_surrounding(neighbour_index, (x, y)) == \
+                       len(Position.get_surrounding_positions((x, y)) & positions)
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
 # collection of position test functions
 
 position_test_functions = \
@@ -580,4 +685,11 @@ position_test_functions = \
         test_Are_Chained_Rec__False_Case,
         test_Are_Chained_Rec__Duplicate_Positions,
         test_Are_Chained_Rec__Touching_Positions,
+
+        test_To_Index__Round_Trip,
+        test_Neighbour_Tables__Match_Position_Functions,
+
+        test_Batch_Functions__Match_Scalar_Functions,
+
+        test_Neighbour_Index__Match_Position_Functions,
     }
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+# Generation of puzzles for Game.highest_score: a board with filled cells and a
+# sequence of standard blocks, for which exactly one list of positions yields
+# the highest score.
+# - Puzzles are built backwards from a solution. The blocks are first placed at
+#   random positions on an empty board. Some of the rows and columns they touch
+#   are then chosen to be cleared, and all other cells of those lines are
+#   filled. Some more random cells outside the placed blocks are filled as well.
+# - Whether the highest score is reached by a single list of positions is then
+#   confirmed by solving the puzzle exhaustively. Candidates that do not meet
+#   that condition, or in which no line is cleared, are rejected.
+# - Puzzles are stored as replays of their unique solution (see Replay), each
+#   preceded by its length as a 32-bit number.
+
+import Block
+import Board
+import Game
+import Replay
+
+import multiprocessing
+import random
+import struct
+
+
+def solve(board, blocks, start=0, cache=None):
+    """
+        Return a tuple of the highest score that can be obtained by dropping all
+        the given blocks from the given start index on the given board, the number
+        of lists of positions yielding that score, and the first of those lists
+        in the order of Game.highest_score.
+        - If no solution is possible, the function returns (None, 0, None).
+        - The given board is left untouched.
+        - Results are memoised in the given cache, keyed by the filled cells of
+          the board and the start index, so that boards reached by several lists
+          of positions are only solved once. The search remains exhaustive
+          otherwise, and its cost grows with the number of droppable positions to
+          the power of the number of blocks: it is meant for small puzzles.
+    """
+    if start == len(blocks):
+        return 0, 1, []
+    if cache is None:
+        cache = {}
+    key = (frozenset(Board.get_filled_indices(board)), start)
+    if key in cache:
+        return cache[key]
+    best_score, nb_best, best_positions = None, 0, None
+    block = blocks[start]
+    for position in Board.get_droppable_positions(board, block):
+        board_copy = Board.copy_board(board)
+        score = Game.game_move(board_copy, block, position)
+        rest_score, nb_rest, rest_positions = solve(board_copy, blocks, start + 1, cache)
+        if rest_score is None:
+            continue
+        score += rest_score
+        if best_score is None or score > best_score:
+            best_score, nb_best, best_positions = score, nb_rest, [position] + rest_positions
+        elif score == best_score:
+            nb_best += nb_rest
+    cache[key] = best_score, nb_best, best_positions
+    return cache[key]
+
+
+def make_candidate(dimension, nb_blocks, generator, noise=0.1):
+    """
+        Return a candidate puzzle built backwards from randomly placed blocks, as
+        a tuple of a board and a list of standard blocks.
+    """
+    blocks = [generator.choice(Block.standard_blocks) for _ in range(nb_blocks)]
+    placed = Board.make_board(dimension)
+    for block in blocks:
+        positions = Board.get_droppable_positions(placed, block)
+        if len(positions) == 0:
+            return None
+        Board.drop_at(placed, block, generator.choice(positions))
+    footprints = Board.get_all_filled_positions(placed)
+    rows    = sorted({y for _, y in footprints})
+    columns = sorted({x for x, _ in footprints})
+    lines = {("row", row) for row in rows if generator.random() < 0.5} | \
+            {("column", column) for column in columns if generator.random() < 0.5}
+    if not lines:
+        lines = {("row", generator.choice(rows))}
+    filled = set()
+    for x in range(1, dimension + 1):
+        for y in range(1, dimension + 1):
+            if (x, y) in footprints:
+                continue
+            if ("row", y) in lines or ("column", x) in lines or generator.random() < noise:
+                filled.add((x, y))
+    return Board.make_board(dimension, filled), blocks
+
+
+def generate_puzzle(dimension, nb_blocks, generator, max_attempts=1000):
+    """
+        Return a puzzle with the given number of blocks on a board of the given
+        dimension, generated with the given random generator.
+        - A puzzle is a tuple of a board, a list of standard blocks, the highest
+          score that can be obtained by dropping those blocks on that board and
+          the unique list of positions that yields that score.
+        - None is returned if no puzzle is found within the given number of
+          attempts.
+    """
+    for _ in range(max_attempts):
+        candidate = make_candidate(dimension, nb_blocks, generator)
+        if candidate is None:
+            continue
+        board, blocks = candidate
+        best_score, nb_best, positions = solve(board, blocks)
+        if nb_best == 1 and \
+                best_score > sum(len(Block.get_all_dot_positions(block)) for block in blocks):
+            return board, blocks, best_score, positions
+    return None
+
+
+def encode_puzzle(puzzle):
+    """
+        Return the given puzzle as a replay of its unique solution.
+    """
+    board, blocks, _, positions = puzzle
+    scores, _ = Game.apply_moves(Board.copy_board(board), blocks, positions, validate=False)
+    moves = [(Block.standard_blocks.index(block), position, score)
+             for block, position, score in zip(blocks, positions, scores)]
+    return Replay.encode_replay(Board.dimension(board), Board.get_all_filled_positions(board), moves)
+
+
+def decode_puzzle(data):
+    """
+        Return the puzzle stored in the given replay of its solution.
+    """
+    dimension, filled, moves = Replay.decode_replay(data)
+    return (Board.make_board(dimension, filled),
+            [Block.standard_blocks[block_index] for block_index, _, _ in moves],
+            sum(score for _, _, score in moves),
+            [position for _, position, _ in moves])
+
+
+def _generate_one(task):
+    dimension, nb_blocks, seed, number = task
+    puzzle = generate_puzzle(dimension, nb_blocks, random.Random("{}:{}".format(seed, number)))
+    return number, None if puzzle is None else encode_puzzle(puzzle)
+
+
+def generate_puzzles(nb_puzzles, dimension=5, nb_blocks=3, seed=0, workers=None):
+    """
+        Return a list of the given number of encoded puzzles, generated in parallel
+        by a pool of the given number of worker processes.
+        - Puzzle i only depends on the seed and on i. Puzzles that could not be
+          generated are left out.
+    """
+    tasks = [(dimension, nb_blocks, seed, number) for number in range(nb_puzzles)]
+    with multiprocessing.Pool(workers) as pool:
+        results = sorted(pool.imap_unordered(_generate_one, tasks), key=lambda result: result[0])
+    return [data for _, data in results if data is not None]
+
+
+def write_puzzles(path, encoded_puzzles):
+    """
+        Write the given encoded puzzles to the file at the given path.
+    """
+    with open(path, "wb") as file:
+        for data in encoded_puzzles:
+            file.write(struct.pack("<I", len(data)))
+            file.write(data)
+
+
+def read_puzzles(path):
+    """
+        Return a list of the encoded puzzles in the file at the given path.
+    """
+    with open(path, "rb") as file:
+        content = file.read()
+    encoded_puzzles, offset = [], 0
+    while offset < len(content):
+        (length,) = struct.unpack_from("<I", content, offset)
+        encoded_puzzles.append(content[offset + 4:offset + 4 + length])
+        offset += 4 + length
+    return encoded_puzzles
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate puzzles with a unique optimal solution.")
+    parser.add_argument("path")
+    parser.add_argument("-n", "--puzzles", type=int, default=100)
+    parser.add_argument("-d", "--dimension", type=int, default=5)
+    parser.add_argument("-b", "--blocks", type=int, default=3)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    args = parser.parse_args()
+    puzzles = generate_puzzles(args.puzzles, args.dimension, args.blocks, args.seed, args.workers)
+    write_puzzles(args.path, puzzles)
+    print("Wrote", len(puzzles), "of", args.puzzles, "puzzles to", args.path)
@@ -0,0 +1,84 @@
+import Board
+import Game
+import Puzzle
+import os
+import random
+import tempfile
+import traceback
+
+
+# tests for the puzzle generator
+
+def test_Generate_Puzzle__Unique_Optimum(score, max_score):
+    """Function generate_puzzle: the solution is the unique optimum of highest_score."""
+    max_score.value += 3
+    try:
+        generator = random.Random(6)
+        for _ in range(5):
+            the_board, blocks, best_score, positions = Puzzle.generate_puzzle(5, 3, generator)
+            filled = Board.get_all_filled_positions(the_board)
+            assert Game.highest_score(the_board, blocks) == (best_score, positions)
+            assert Puzzle.solve(the_board, blocks) == (best_score, 1, positions)
+            assert Board.get_all_filled_positions(the_board) == filled
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+def test_Solve__Counts_Optimal_Solutions(score, max_score):
+    """Function solve: number of position lists yielding the highest score."""
+    max_score.value += 2
+    try:
+        the_board = Board.make_board(2)
+        single = Game.normalized_standard_blocks[0]
+        assert Puzzle.solve(the_board, [single]) == (1, 4, [(1, 1)])
+        assert Puzzle.solve(the_board, [single, single]) == (1 + 1 + 10, 8, [(1, 1), (1, 2)])
+        assert Puzzle.solve(the_board, [Game.normalized_standard_blocks[4]]) == (None, 0, None)
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_Solve__Memoised_Boards(score, max_score):
+    """Function solve: boards reached in several ways are solved once."""
+    max_score.value += 2
+    try:
+        the_board = Board.make_board(3)
+        single = Game.normalized_standard_blocks[0]
+        cache = {}
+        # The optimum fills any of the 6 lines in any order, and only 1 + 9 + 36
+        # distinct boards are solved before the last block.
+        assert Puzzle.solve(the_board, [single] * 3, cache=cache) == \
+               (3 + 10, 6 * 3 * 2, [(1, 1), (1, 2), (1, 3)])
+        assert len(cache) == 1 + 9 + 36
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_Generate_Puzzles__Written_And_Read(score, max_score):
+    """Functions generate_puzzles, write_puzzles and read_puzzles: round trip."""
+    max_score.value += 2
+    try:
+        encoded = Puzzle.generate_puzzles(4, 5, 2, seed=3, workers=2)
+        assert len(encoded) == 4
+        assert encoded == Puzzle.generate_puzzles(4, 5, 2, seed=3, workers=1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "puzzles.bin")
+            Puzzle.write_puzzles(path, encoded)
+            assert Puzzle.read_puzzles(path) == encoded
+        for data in encoded:
+            the_board, blocks, best_score, positions = Puzzle.decode_puzzle(data)
+            assert Puzzle.solve(the_board, blocks) == (best_score, 1, positions)
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+puzzle_test_functions = \
+    {
+        test_Generate_Puzzle__Unique_Optimum,
+        test_Solve__Counts_Optimal_Solutions,
+        test_Solve__Memoised_Boards,
+        test_Generate_Puzzles__Written_And_Read,
+    }
@@ -0,0 +1,298 @@
+import Block
+import Board
+import Game
+
+# Compact binary replays of games.
+# - A replay holds the dimension of the board, the positions of its initially
+#   filled cells, and for each move the index in Block.standard_blocks of the
+#   dropped block, the position of its anchor and the score recorded for it.
+# - Anchors are relative to the blocks of one of two frames, which the replay
+#   records: Block.standard_blocks for encode_replay, and
+#   Game.normalized_standard_blocks for encode_session, so that decoded moves
+#   are those that were played.
+# - Numbers are written as variable-length unsigned integers of 7 bits per byte
+#   (LEB128), signed numbers are zigzag encoded first.
+# - Initially filled cells are written as the differences between their sorted
+#   cell indices (see Position.to_index).
+# - Each move is written as two numbers: the difference between the cell index
+#   of the bottom left corner of the block's footprint and that of the previous
+#   move, combined with the block index, followed by the recorded score. Typical
+#   moves take 2 to 4 bytes.
+# Replays are verified by playing them on a bitboard, an integer in which bit i
+# is set if the cell with index i is filled.
+
+MAGIC   = b"1010"
+VERSION = 2
+
+_nb_blocks = len(Block.standard_blocks)
+
+_frames = (Block.standard_blocks, Game.normalized_standard_blocks)
+
+
+def _write_number(out, number):
+    while number >= 0x80:
+        out.append((number & 0x7F) | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _read_number(data, offset):
+    number, shift = 0, 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Truncated replay")
+        byte = data[offset]
+        offset += 1
+        number |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return number, offset
+        shift += 7
+
+
+def _zigzag(number):
+    return number * 2 if number >= 0 else -number * 2 - 1
+
+
+def _encode(dimension, initial_positions, corner_moves, frame):
+    stride = dimension + 1
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    out.append(frame)
+    _write_number(out, dimension)
+    cells = sorted(x + y * stride for x, y in initial_positions)
+    _write_number(out, len(cells))
+    previous = 0
+    for cell in cells:
+        _write_number(out, cell - previous)
+        previous = cell
+    _write_number(out, len(corner_moves))
+    previous = 0
+    for block_index, corner, score in corner_moves:
+        _write_number(out, _zigzag(corner - previous) * _nb_blocks + block_index)
+        _write_number(out, score)
+        previous = corner
+    return bytes(out)
+
+
+def encode_replay(dimension, initial_positions, moves):
+    """
+        Return the replay of a game on a board with the given dimension and
+        initially filled cells at the given positions, in which the given moves
+        were played, as a bytes object.
+        - Each move is a tuple of an index in Block.standard_blocks, the position
+          at which that block was dropped and the score obtained from the move.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+        - The given initial positions are proper positions for the board.
+        - The blocks of all moves fit within the boundaries of the board at
+          their position.
+    """
+    stride = dimension + 1
+    corner_moves = []
+    for block_index, (x, y), score in moves:
+        topleft = Block.standard_blocks[block_index].topleft
+        corner_moves.append((block_index, (x + topleft[0]) + (y + topleft[1]) * stride, score))
+    return _encode(dimension, initial_positions, corner_moves, 0)
+
+
+def encode_session(session):
+    """
+        Return the replay of the game played so far in the given Game.GameSession,
+        as a bytes object.
+        - The moves of the replay are those of the history of the session, with
+          anchors relative to Game.normalized_standard_blocks.
+    """
+    stride = session.dimension + 1
+    corner_moves = []
+    for block_index, (x, y), score in session.history:
+        topleft = Game.normalized_standard_blocks[block_index].topleft
+        corner_moves.append((block_index, (x + topleft[0]) + (y + topleft[1]) * stride, score))
+    return _encode(session.dimension, session.positions_to_fill, corner_moves, 1)
+
+
+def _decode(data):
+    # Every read is bounds checked, so that truncated data raises a ValueError,
+    # as do initially filled cells outside the board and trailing bytes.
+    if len(data) <= len(MAGIC) + 1 or data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != VERSION:
+        raise ValueError("Not a replay of version {}".format(VERSION))
+    frame = data[len(MAGIC) + 1]
+    if frame >= len(_frames):
+        raise ValueError("Unknown frame of blocks in replay")
+    offset = len(MAGIC) + 2
+    dimension, offset = _read_number(data, offset)
+    if dimension < 1:
+        raise ValueError("Invalid dimension in replay")
+    stride = dimension + 1
+    nb_cells, offset = _read_number(data, offset)
+    cells, cell = [], 0
+    for _ in range(nb_cells):
+        delta, offset = _read_number(data, offset)
+        cell += delta
+        if not (1 <= cell % stride and 1 <= cell // stride <= dimension):
+            raise ValueError("Initially filled cell outside the board in replay")
+        cells.append(cell)
+    nb_moves, offset = _read_number(data, offset)
+    # The moves take the rest of the data: it is read as a single run of
+    # numbers, which must end with the last byte and hold two numbers per move.
+    numbers, number, shift = [], 0, 0
+    for byte in data[offset:]:
+        if byte < 0x80:
+            numbers.append(number | (byte << shift))
+            number, shift = 0, 0
+        else:
+            number |= (byte & 0x7F) << shift
+            shift += 7
+    if shift > 0 or len(numbers) < 2 * nb_moves:
+        raise ValueError("Truncated replay")
+    if len(numbers) > 2 * nb_moves:
+        raise ValueError("Trailing bytes after replay")
+    moves, corner = [], 0
+    for combined, score in zip(numbers[0::2], numbers[1::2]):
+        delta, block_index = divmod(combined, _nb_blocks)
+        corner += -((delta + 1) >> 1) if delta & 1 else delta >> 1
+        moves.append((block_index, corner, score))
+    return dimension, _frames[frame], cells, moves
+
+
+def _decode_anchors(data):
+    # Return the decoded replay together with the blocks of its frame.
+    dimension, blocks, cells, corner_moves = _decode(data)
+    stride = dimension + 1
+    moves = []
+    for block_index, corner, score in corner_moves:
+        topleft = blocks[block_index].topleft
+        y, x = divmod(corner, stride)
+        moves.append((block_index, (x - topleft[0], y - topleft[1]), score))
+    return dimension, {(cell % stride, cell // stride) for cell in cells}, moves, blocks
+
+
+def decode_replay(data):
+    """
+        Return the content of the given replay as a tuple of the dimension of the
+        board, the set of initially filled positions and the list of moves, as
+        given to encode_replay, or as in the history of the session given to
+        encode_session.
+        - A ValueError is raised if the given data is not a replay.
+    """
+    return _decode_anchors(data)[:3]
+
+
+def write_replay(path, data):
+    """
+        Write the given replay to the file at the given path.
+    """
+    with open(path, "wb") as file:
+        file.write(data)
+
+
+def read_replay(path):
+    """
+        Return the replay stored in the file at the given path.
+    """
+    with open(path, "rb") as file:
+        return file.read()
+
+
+class _Bitboard:
+
+    # Masks for a bitboard with a given dimension: the mask of each row and each
+    # column, and for each block the mask of its footprint with its bottom left
+    # corner on cell index 0, together with its size.
+    # Placements of blocks are computed as they are first needed: for a block
+    # index and a corner, the mask of the footprint, the masks of the rows and
+    # columns it touches and the number of its dots, or None if the block does
+    # not fit within the board with its bottom left corner on that cell.
+
+    def __init__(self, dimension):
+        stride = dimension + 1
+        line = (1 << dimension) - 1
+        self.rows    = [line << (1 + y * stride) for y in range(1, dimension + 1)]
+        self.columns = [sum(1 << (x + y * stride) for y in range(1, dimension + 1))
+                        for x in range(1, dimension + 1)]
+        self.blocks  = []
+        for block in Block.standard_blocks:
+            mask = 0
+            for x, y in Block.get_all_dot_positions(block):
+                mask |= 1 << ((x - block.topleft[0]) + (y - block.topleft[1]) * stride)
+            self.blocks.append((mask, block.size[0], block.size[1], len(block.dots)))
+        self.dimension  = dimension
+        self.placements = {}
+
+    def get_placement(self, block_index, corner):
+        key = (block_index, corner)
+        if key not in self.placements:
+            mask, width, height, nb_dots = self.blocks[block_index]
+            y, x = divmod(corner, self.dimension + 1)
+            if x < 1 or y < 1 or x + width > self.dimension or y + height > self.dimension:
+                placement = None
+            else:
+                placement = (mask << corner, self.rows[y - 1:y + height],
+                             self.columns[x - 1:x + width], nb_dots)
+            self.placements[key] = placement
+        return self.placements[key]
+
+
+_bitboards = {}
+
+
+def verify_replay(data, reference=False):
+    """
+        Verify the given replay by playing all its moves.
+        - The function returns a tuple of a boolean indicating whether the replay
+          is valid, the number of moves that were verified and the total score of
+          those moves. A replay is valid if each block can be dropped at its
+          position, and if each recorded score is the score of Game.game_move.
+        - Verification stops at the first invalid move.
+        - If reference is true, moves are played with Board.can_be_dropped_at and
+          Game.game_move, instead of on a bitboard.
+        - A ValueError is raised if the given data is not a replay.
+    """
+    if reference:
+        dimension, initial_positions, moves, blocks = _decode_anchors(data)
+        board = Board.make_board(dimension, initial_positions)
+        total = 0
+        for number, (block_index, position, score) in enumerate(moves):
+            block = blocks[block_index]
+            if not Board.can_be_dropped_at(board, block, position) or \
+                    Game.game_move(board, block, position) != score:
+                return False, number, total
+            total += score
+        return True, len(moves), total
+
+    dimension, _, cells, moves = _decode(data)
+    masks = _bitboards.get(dimension)
+    if masks is None:
+        masks = _bitboards[dimension] = _Bitboard(dimension)
+    placements, get_placement = masks.placements, masks.get_placement
+    board = 0
+    for cell in cells:
+        board |= 1 << cell
+    total = 0
+    for number, (block_index, corner, score) in enumerate(moves):
+        placement = placements.get((block_index, corner))
+        if placement is None:
+            placement = get_placement(block_index, corner)
+            if placement is None:
+                return False, number, total
+        mask, touched_rows, touched_columns, nb_dots = placement
+        if board & mask:
+            return False, number, total
+        board |= mask
+        # Only lines touched by the block can become full, except on the first
+        # move, which also clears lines that were full on the initial board.
+        if number == 0:
+            touched_rows, touched_columns = masks.rows, masks.columns
+        cleared, nb_lines = 0, 0
+        for row in touched_rows:
+            if board & row == row:
+                cleared |= row
+                nb_lines += 1
+        for column in touched_columns:
+            if board & column == column:
+                cleared |= column
+                nb_lines += 1
+        board &= ~cleared
+        if score != nb_dots + 10 * ((nb_lines + 1) * nb_lines) // 2:
+            return False, number, total
+        total += score
+    return True, len(moves), total
@@ -0,0 +1,123 @@
+import Block
+import Board
+import Game
+import Replay
+import traceback
+
+
+# tests for replays
+
+def test_Encode_Replay__Round_Trip(score, max_score):
+    """Functions encode_replay and decode_replay: round trip of a game."""
+    max_score.value += 3
+    try:
+        initial_positions = {(1, 1), (2, 4), (6, 6), (3, 3)}
+        the_board = Board.make_board(6, initial_positions)
+        source = Block.make_block_source(21)
+        moves = []
+        while True:
+            block_index = Block.draw_block_index(source)
+            block = Block.standard_blocks[block_index]
+            positions = Board.get_droppable_positions(the_board, block)
+            if len(positions) == 0:
+                break
+            position = positions[-1 - len(moves) % len(positions)]
+            moves.append((block_index, position, Game.game_move(the_board, block, position)))
+        data = Replay.encode_replay(6, initial_positions, moves)
+        assert len(data) <= 12 + 4 * len(moves)
+        assert Replay.decode_replay(data) == (6, initial_positions, moves)
+        total = sum(move[2] for move in moves)
+        assert Replay.verify_replay(data) == (True, len(moves), total)
+        assert Replay.verify_replay(data, reference=True) == (True, len(moves), total)
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+def test_Verify_Replay__Invalid_Moves(score, max_score):
+    """Function verify_replay: wrong scores and overlapping blocks are detected."""
+    max_score.value += 3
+    try:
+        initial_positions = {(1, 2), (2, 2), (3, 2), (4, 1)}
+        moves = [(0, (4, 2), 1 + 10), (17, (1, 3), 4), (17, (2, 3), 4)]
+        for reference in (False, True):
+            data = Replay.encode_replay(4, initial_positions, moves)
+            assert Replay.verify_replay(data, reference) == (False, 2, 15)
+            data = Replay.encode_replay(4, initial_positions, moves[:2])
+            assert Replay.verify_replay(data, reference) == (True, 2, 15)
+            data = Replay.encode_replay(4, initial_positions, [(0, (4, 2), 1)])
+            assert Replay.verify_replay(data, reference) == (False, 0, 0)
+            data = Replay.encode_replay(4, {(1, 1), (1, 2), (1, 3), (1, 4)}, [(0, (3, 3), 11)])
+            assert Replay.verify_replay(data, reference) == (True, 1, 11)
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+def test_Encode_Session__Verified(score, max_score):
+    """Function encode_session: replays of game sessions are valid."""
+    max_score.value += 2
+    try:
+        session = Game.GameSession(7, seed=5, positions_to_fill={(2, 2), (5, 1)})
+        while not session.is_over():
+            session.step(session.legal_moves()[session.moves % len(session.legal_moves())])
+        data = Replay.encode_session(session)
+        assert Replay.decode_replay(data) == (7, {(2, 2), (5, 1)}, session.history)
+        assert Replay.verify_replay(data) == (True, session.moves, session.score)
+        assert Replay.verify_replay(data, reference=True) == (True, session.moves, session.score)
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_Encode_Session__Round_Trip(score, max_score):
+    """Functions encode_session and decode_replay: decoded moves replay the session."""
+    max_score.value += 2
+    try:
+        session = Game.GameSession(6, 5)
+        while not session.is_over():
+            session.step(session.legal_moves()[-1 - session.moves % len(session.legal_moves())])
+        dimension, initial_positions, moves = Replay.decode_replay(Replay.encode_session(session))
+        assert moves == session.history
+        replayed = Game.GameSession(dimension, 5)
+        for block_index, position, move_score in moves:
+            assert replayed.block_index == block_index
+            assert replayed.step(position) == move_score
+        assert (replayed.score, replayed.is_over()) == (session.score, True)
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_Decode_Replay__Malformed_Data(score, max_score):
+    """Functions decode_replay and verify_replay: malformed data is rejected."""
+    max_score.value += 3
+    try:
+        moves = [(0, (4, 2), 11), (17, (1, 3), 4), (5, (2, 1), 300)]
+        data = Replay.encode_replay(4, {(1, 2), (2, 2), (3, 2), (4, 1)}, moves)
+        assert Replay.decode_replay(data)[2] == moves
+        malformed = [data[:size] for size in range(len(data))]
+        malformed += [data + b"\x00", data + b"\x81", b"1010", b"1011\x02\x00", b"1010\x02\x02\x04\x00\x00",
+                      data[:5] + b"\x05" + data[6:], b"",
+                      Replay.encode_replay(4, {(5, 1)}, []),
+                      Replay.encode_replay(4, {(1, 5)}, [])]
+        for reference in (False, True):
+            for bad_data in malformed:
+                try:
+                    Replay.verify_replay(bad_data, reference)
+                    assert False, bad_data
+                except ValueError:
+                    pass
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+replay_test_functions = \
+    {
+        test_Encode_Replay__Round_Trip,
+        test_Verify_Replay__Invalid_Moves,
+        test_Encode_Session__Verified,
+        test_Encode_Session__Round_Trip,
+        test_Decode_Replay__Malformed_Data,
+    }
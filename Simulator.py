@@ -0,0 +1,135 @@
+import Block
+import Game
+
+import numpy
+
+# A batch of independent games on boards of the same dimension, advanced in
+# lockstep with array operations instead of per-game Python loops.
+# - Boards are stored as an (N, D, D) array of type uint8, in which the cell at
+#   position (x, y) of game n is at index [n, x - 1, y - 1]. Masks of legal
+#   moves have the same layout. That is the layout of all boards and masks
+#   stored in arrays: flattened, as in Game.GameSession.legal_move_mask and in
+#   the records of Corpus, the cell is at index (x - 1) * D + (y - 1).
+# - The rules are those of Board.drop_at, Board.clear_full_rows_and_columns and
+#   Game.game_move: all rows and columns that are full after a drop are cleared
+#   at once, and a move scores the number of dots of the block plus 10, 20, 30,
+#   ... for each cleared line.
+# - Games draw their blocks from Game.normalized_standard_blocks.
+
+
+class _Shape:
+
+    def __init__(self, block):
+        self.offsets = tuple(sorted(Block.get_all_dot_positions(block)))
+        self.nb_dots = len(self.offsets)
+
+
+_shapes = tuple(_Shape(block) for block in Game.normalized_standard_blocks)
+
+# Number of cells by which boards are padded, so that every dot of every block
+# anchored on the board falls within the padded board.
+_padding = max(max(abs(dx), abs(dy)) for shape in _shapes for dx, dy in shape.offsets)
+
+_nb_dots = numpy.array([shape.nb_dots for shape in _shapes], dtype=numpy.int64)
+
+
+class GameBatch:
+    """
+        A batch of independent games on boards of the given dimension.
+        - Blocks are drawn from a NumPy random generator seeded with the given
+          seed, so that batches with the same seed see the same blocks as long
+          as the same moves are played.
+        - A game is over as soon as its current block cannot be dropped anywhere
+          on its board. Games that are over are left untouched by further steps.
+    """
+
+    def __init__(self, number_of_games, dimension=10, seed=None):
+        self.number_of_games = number_of_games
+        self.dimension = dimension
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """
+            Start all games anew on empty boards, with blocks drawn from a generator
+            seeded with the given seed.
+        """
+        n, d = self.number_of_games, self.dimension
+        self.random = numpy.random.default_rng(seed)
+        self.boards = numpy.zeros((n, d, d), dtype=numpy.uint8)
+        self.scores = numpy.zeros(n, dtype=numpy.int64)
+        self.moves  = numpy.zeros(n, dtype=numpy.int64)
+        self.blocks = self.random.integers(len(_shapes), size=n)
+        self.done   = numpy.zeros(n, dtype=bool)
+        self.update_legal_moves()
+
+    def update_legal_moves(self):
+        n, d, p = self.number_of_games, self.dimension, _padding
+        occupied = numpy.ones((n, d + 2 * p, d + 2 * p), dtype=bool)
+        occupied[:, p:p + d, p:p + d] = self.boards
+        legal = numpy.zeros((n, d, d), dtype=bool)
+        active = ~self.done
+        for index in numpy.unique(self.blocks[active]):
+            games = numpy.flatnonzero(active & (self.blocks == index))
+            free = numpy.ones((len(games), d, d), dtype=bool)
+            for dx, dy in _shapes[index].offsets:
+                free &= ~occupied[games, p + dx:p + dx + d, p + dy:p + dy + d]
+            legal[games] = free
+        self.legal = legal
+        self.done |= ~legal.any(axis=(1, 2))
+
+    def legal_move_masks(self):
+        """
+            Return a boolean array of shape (N, D, D) indicating for each game at
+            which positions its current block can be dropped.
+            - The entry for position (x, y) of game n is at index [n, x - 1, y - 1].
+            - All entries of games that are over are false.
+        """
+        return self.legal
+
+    def random_moves(self, generator):
+        """
+            Return an integer array of shape (N, 2) with a random legal position
+            for the current block of each game, chosen with the given NumPy random
+            generator.
+            - The position (1, 1) is returned for games that are over.
+        """
+        flat = self.legal.reshape(self.number_of_games, -1)
+        choice = numpy.argmax(generator.random(flat.shape) * flat, axis=1)
+        return numpy.stack((choice // self.dimension + 1, choice % self.dimension + 1), axis=1)
+
+    def step(self, positions):
+        """
+            Drop the current block of each game at the corresponding position in the
+            given (N, 2) array, clear all full rows and columns and draw new blocks.
+            - The function returns a tuple of an integer array with the score of
+              each move, followed by a boolean array marking the games in which a
+              block has effectively been dropped.
+            - Games that are over and games for which the given position is not
+              legal are left untouched and score 0.
+        """
+        n, d = self.number_of_games, self.dimension
+        positions = numpy.asarray(positions)
+        x = positions[:, 0] - 1
+        y = positions[:, 1] - 1
+        inside = (x >= 0) & (x < d) & (y >= 0) & (y < d)
+        games = numpy.arange(n)
+        dropped = inside & ~self.done
+        dropped[dropped] = self.legal[games[dropped], x[dropped], y[dropped]]
+
+        for index in numpy.unique(self.blocks[dropped]):
+            selected = numpy.flatnonzero(dropped & (self.blocks == index))
+            for dx, dy in _shapes[index].offsets:
+                self.boards[selected, x[selected] + dx, y[selected] + dy] = 1
+
+        full_columns = self.boards.all(axis=2)
+        full_rows    = self.boards.all(axis=1)
+        nb_lines = full_columns.sum(axis=1) + full_rows.sum(axis=1)
+        self.boards[full_columns[:, :, None] | full_rows[:, None, :]] = 0
+
+        move_scores = numpy.where(
+            dropped, _nb_dots[self.blocks] + 10 * ((nb_lines + 1) * nb_lines) // 2, 0)
+        self.scores += move_scores
+        self.moves  += dropped
+        self.blocks[dropped] = self.random.integers(len(_shapes), size=int(dropped.sum()))
+        self.update_legal_moves()
+        return move_scores, dropped
@@ -0,0 +1,87 @@
+import Board
+import Game
+import traceback
+
+
+# tests for GameBatch
+
+def test_GameBatch__Matches_Game_Move(score, max_score):
+    """Class GameBatch: moves follow the rules of Game.game_move."""
+    max_score.value += 10
+    try:
+        import numpy
+        import Simulator
+        batch = Simulator.GameBatch(16, 5, seed=3)
+        boards = [Board.make_board(5) for _ in range(16)]
+        scores = [0] * 16
+        generator = numpy.random.default_rng(7)
+        while not batch.done.all():
+            blocks = [Game.normalized_standard_blocks[i] for i in batch.blocks]
+            masks = batch.legal_move_masks()
+            for n in range(16):
+                legal = Board.get_droppable_positions(boards[n], blocks[n])
+                assert {(x + 1, y + 1) for x, y in zip(*numpy.nonzero(masks[n]))} == set(legal)
+                assert batch.done[n] == (len(legal) == 0)
+            positions = batch.random_moves(generator)
+            move_scores, dropped = batch.step(positions)
+            for n in range(16):
+                if dropped[n]:
+                    position = tuple(int(c) for c in positions[n])
+                    scores[n] += Game.game_move(boards[n], blocks[n], position)
+                    assert move_scores[n] > 0
+                else:
+                    assert move_scores[n] == 0
+                filled = {(int(x) + 1, int(y) + 1) for x, y in zip(*numpy.nonzero(batch.boards[n]))}
+                assert filled == Board.get_all_filled_positions(boards[n])
+        assert [int(s) for s in batch.scores] == scores
+        score.value += 10
+    except:
+        print(traceback.format_exc())
+
+
+def test_GameBatch__Illegal_Moves_Ignored(score, max_score):
+    """Class GameBatch: illegal positions leave the games untouched."""
+    max_score.value += 2
+    try:
+        import numpy
+        import Simulator
+        batch = Simulator.GameBatch(4, 3, seed=1)
+        move_scores, dropped = batch.step(numpy.array([(0, 1), (4, 4), (-2, 9), (2, 0)]))
+        assert not dropped.any() and not move_scores.any()
+        assert not batch.boards.any() and not batch.moves.any()
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_GameBatch__Same_Layout_As_GameSession(score, max_score):
+    """Class GameBatch: masks have the layout of GameSession.legal_move_mask."""
+    max_score.value += 2
+    try:
+        import numpy
+        import Simulator
+        batch = Simulator.GameBatch(1, 6, seed=5)
+        session = Game.GameSession(6, 5)
+        while not session.is_over():
+            # Both play the block of the session.
+            batch.blocks[0] = session.block_index
+            batch.update_legal_moves()
+            mask = batch.legal_move_masks()[0]
+            assert numpy.array_equal(mask.reshape(-1).astype(bool), session.legal_move_mask())
+            position = session.legal_moves()[-1]
+            session.step(position)
+            batch.step(numpy.array([position]))
+            assert numpy.array_equal(batch.boards[0].reshape(-1).astype(bool),
+                                     [(x, y) in Board.get_all_filled_positions(session.board)
+                                      for x in range(1, 7) for y in range(1, 7)])
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+simulator_test_functions = \
+    {
+        test_GameBatch__Matches_Game_Move,
+        test_GameBatch__Illegal_Moves_Ignored,
+        test_GameBatch__Same_Layout_As_GameSession,
+    }
@@ -0,0 +1,236 @@
+import Position
+import Block
+import Board
+
+import math
+
+# Statistics over a stream of games, kept in bounded memory.
+# - Scores and game lengths are summarized by their count, mean and variance,
+#   updated online, and by a quantile sketch with bounded relative error.
+# - Lines cleared per move and game lengths are counted in histograms.
+# - Filled cells of the observed boards are counted per dimension, as heatmaps.
+# Statistics gathered in different processes can be merged, as long as their
+# quantile sketches have the same relative accuracy.
+
+
+class _Moments:
+
+    def __init__(self):
+        self.count = 0
+        self.mean  = 0.0
+        self.m2    = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2   += delta * (value - self.mean)
+
+    def merge(self, other):
+        count = self.count + other.count
+        if count == 0:
+            return
+        delta = other.mean - self.mean
+        self.m2   += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+class _QuantileSketch:
+
+    # Values are counted in buckets with logarithmically growing widths, so that
+    # every quantile is reported with a relative error of at most accuracy.
+    # Values below 1 share a single bucket, as scores and lengths are integers.
+
+    def __init__(self, accuracy):
+        self.accuracy = accuracy
+        self.gamma    = (1 + accuracy) / (1 - accuracy)
+        self.buckets  = {}
+        self.small    = 0
+        self.count    = 0
+
+    def add(self, value):
+        self.count += 1
+        if value < 1:
+            self.small += 1
+        else:
+            key = math.ceil(math.log(value, self.gamma))
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other):
+        assert self.accuracy == other.accuracy
+        self.count += other.count
+        self.small += other.small
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.small
+        if rank < seen:
+            return 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class _Statistics:
+
+    def __init__(self, accuracy):
+        self.scores          = _Moments()
+        self.lengths         = _Moments()
+        self.score_quantiles = _QuantileSketch(accuracy)
+        self.length_quantiles = _QuantileSketch(accuracy)
+        self.length_histogram = {}
+        self.lines_histogram = {}
+        self.unfinished      = 0
+        self.heatmaps        = {}
+
+
+def make_statistics(accuracy=0.01):
+    """
+        Return new, empty statistics over games.
+        - Quantiles of scores and game lengths are reported with a relative error
+          of at most the given accuracy.
+        ASSUMPTIONS
+        - The given accuracy is a number strictly between 0 and 1.
+    """
+    return _Statistics(accuracy)
+
+
+
+def get_lines_cleared(block, move_score):
+    """
+        Return the number of rows and columns cleared by a move of the given block
+        that obtained the given score, as returned by Game.game_move.
+        ASSUMPTIONS
+        - The given block is a proper block.
+        - The given score is a score returned by Game.game_move for the given block.
+    """
+    extra = move_score - len(Block.get_all_dot_positions(block))
+    lines = 0
+    while 5 * (lines + 1) * (lines + 2) <= extra:
+        lines += 1
+    return lines
+
+
+
+def add_move(statistics, block, move_score):
+    """
+        Add a move of the given block that obtained the given score, as returned by
+        Game.game_move, to the given statistics.
+    """
+    lines = get_lines_cleared(block, move_score)
+    statistics.lines_histogram[lines] = statistics.lines_histogram.get(lines, 0) + 1
+
+
+
+def add_board(statistics, board):
+    """
+        Add the filled cells of the given board to the occupancy heatmap for its
+        dimension in the given statistics.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    dimension = Board.dimension(board)
+    heatmap = statistics.heatmaps.get(dimension)
+    if heatmap is None:
+        heatmap = statistics.heatmaps[dimension] = [0] * ((dimension + 1) * (dimension + 1))
+    for index in Board.get_filled_indices(board):
+        heatmap[index] += 1
+
+
+
+def add_game(statistics, score, moves):
+    """
+        Add a finished game with the given final score and number of moves to the
+        given statistics.
+        - A score of None, as returned by Game.play_greedy if no solution is
+          possible, is counted as an unfinished game and not added otherwise.
+    """
+    if score is None:
+        statistics.unfinished += 1
+        return
+    statistics.scores.add(score)
+    statistics.lengths.add(moves)
+    statistics.score_quantiles.add(score)
+    statistics.length_quantiles.add(moves)
+    statistics.length_histogram[moves] = statistics.length_histogram.get(moves, 0) + 1
+
+
+
+def add_result(statistics, result):
+    """
+        Add a game result as produced by Tournament.play_one to the given statistics.
+    """
+    add_game(statistics, result["score"], result["moves"])
+
+
+
+def merge_statistics(statistics, other):
+    """
+        Merge the other statistics into the given statistics.
+        ASSUMPTIONS
+        - Both statistics were made with the same accuracy.
+    """
+    statistics.scores.merge(other.scores)
+    statistics.lengths.merge(other.lengths)
+    statistics.score_quantiles.merge(other.score_quantiles)
+    statistics.length_quantiles.merge(other.length_quantiles)
+    for mine, theirs in ((statistics.length_histogram, other.length_histogram),
+                         (statistics.lines_histogram, other.lines_histogram)):
+        for key, count in theirs.items():
+            mine[key] = mine.get(key, 0) + count
+    statistics.unfinished += other.unfinished
+    for dimension, heatmap in other.heatmaps.items():
+        if dimension in statistics.heatmaps:
+            statistics.heatmaps[dimension] = \
+                [a + b for a, b in zip(statistics.heatmaps[dimension], heatmap)]
+        else:
+            statistics.heatmaps[dimension] = list(heatmap)
+
+
+
+def get_heatmap(statistics, dimension):
+    """
+        Return the occupancy heatmap for boards with the given dimension as a
+        dictionary mapping each position to the number of observed boards on
+        which its cell was filled.
+    """
+    heatmap = statistics.heatmaps.get(dimension)
+    return {
+        (x, y): heatmap[Position.to_index(dimension, (x, y))] if heatmap is not None else 0
+        for x in range(1, dimension + 1) for y in range(1, dimension + 1)
+    }
+
+
+
+def get_summary(statistics, quantiles=(0.01, 0.1, 0.5, 0.9, 0.99)):
+    """
+        Return a dictionary summarizing the given statistics, with the number of
+        games, the mean, standard deviation and the given quantiles of scores and
+        game lengths, and the histograms of lines cleared per move and game lengths.
+    """
+    return {
+        "games": statistics.scores.count,
+        "unfinished": statistics.unfinished,
+        "score": {
+            "mean": statistics.scores.mean,
+            "stdev": math.sqrt(statistics.scores.variance()),
+            "quantiles": {q: statistics.score_quantiles.quantile(q) for q in quantiles},
+        },
+        "length": {
+            "mean": statistics.lengths.mean,
+            "stdev": math.sqrt(statistics.lengths.variance()),
+            "quantiles": {q: statistics.length_quantiles.quantile(q) for q in quantiles},
+        },
+        "lines_cleared_per_move": dict(sorted(statistics.lines_histogram.items())),
+        "game_length": dict(sorted(statistics.length_histogram.items())),
+    }
@@ -0,0 +1,86 @@
+import Board
+import Game
+import Statistics
+import pickle
+import random
+import statistics
+import traceback
+
+
+# tests for the statistics aggregator
+
+def test_Add_Game__Moments_And_Quantiles(score, max_score):
+    """Function add_game: mean, variance and quantiles of scores."""
+    max_score.value += 3
+    try:
+        generator = random.Random(4)
+        scores = [generator.randint(0, 5000) for _ in range(2000)]
+        stats = Statistics.make_statistics(0.01)
+        for game_score in scores:
+            Statistics.add_game(stats, game_score, game_score % 17)
+        Statistics.add_game(stats, None, 3)
+        summary = Statistics.get_summary(stats, (0.1, 0.5, 0.9))
+        assert summary["games"] == 2000 and summary["unfinished"] == 1
+        assert abs(summary["score"]["mean"] - statistics.mean(scores)) < 1e-6
+        assert abs(summary["score"]["stdev"] - statistics.stdev(scores)) < 1e-6
+        ordered = sorted(scores)
+        for q in (0.1, 0.5, 0.9):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert abs(summary["score"]["quantiles"][q] - exact) <= 0.011 * exact + 1
+        assert sum(summary["game_length"].values()) == 2000
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+def test_Merge_Statistics__Same_As_Single_Stream(score, max_score):
+    """Function merge_statistics: merged statistics equal those of a single stream."""
+    max_score.value += 3
+    try:
+        generator = random.Random(8)
+        games = [(generator.randint(0, 900), generator.randint(0, 60)) for _ in range(500)]
+        single = Statistics.make_statistics()
+        parts = [Statistics.make_statistics() for _ in range(3)]
+        for i, (game_score, moves) in enumerate(games):
+            Statistics.add_game(single, game_score, moves)
+            Statistics.add_game(parts[i % 3], game_score, moves)
+        merged = pickle.loads(pickle.dumps(parts[0]))
+        Statistics.merge_statistics(merged, parts[1])
+        Statistics.merge_statistics(merged, parts[2])
+        expected, actual = Statistics.get_summary(single), Statistics.get_summary(merged)
+        assert actual["score"]["quantiles"] == expected["score"]["quantiles"]
+        assert actual["game_length"] == expected["game_length"]
+        assert abs(actual["score"]["mean"] - expected["score"]["mean"]) < 1e-6
+        assert abs(actual["length"]["stdev"] - expected["length"]["stdev"]) < 1e-6
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+def test_Add_Move__Lines_Cleared_And_Heatmap(score, max_score):
+    """Functions add_move and add_board: lines cleared and occupancy from game_move."""
+    max_score.value += 2
+    try:
+        stats = Statistics.make_statistics()
+        the_board = Board.make_board(3, {(1, 1), (2, 1), (1, 2), (2, 2), (1, 3), (2, 3)})
+        block = Game.normalized_standard_blocks[6]
+        Statistics.add_move(stats, block, Game.game_move(the_board, block, (3, 3)))
+        Statistics.add_board(stats, the_board)
+        block = Game.normalized_standard_blocks[0]
+        Statistics.add_move(stats, block, Game.game_move(the_board, block, (2, 2)))
+        Statistics.add_board(stats, the_board)
+        assert stats.lines_histogram == {6: 1, 0: 1}
+        heatmap = Statistics.get_heatmap(stats, 3)
+        assert heatmap[(2, 2)] == 1 and sum(heatmap.values()) == 1
+        assert Statistics.get_heatmap(stats, 4)[(4, 4)] == 0
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+statistics_test_functions = \
+    {
+        test_Add_Game__Moments_And_Quantiles,
+        test_Merge_Statistics__Same_As_Single_Stream,
+        test_Add_Move__Lines_Cleared_And_Heatmap,
+    }
@@ -0,0 +1,62 @@
+import sys
+
+# Redrawing of frames of text on an ANSI terminal.
+# - The first frame, and any frame with another number of lines than the frame
+#   before it, clears the screen and is written in full.
+# - Other frames only rewrite the lines that differ from the previous frame:
+#   the cursor is moved to the start of each such line, the line is written and
+#   the rest of it is erased.
+# - Each frame is written with a single write, after which the cursor is left on
+#   the line below the frame.
+
+_clear_screen = "\x1b[H\x1b[2J"
+_erase_line   = "\x1b[K"
+
+
+def _move_to(line):
+    return "\x1b[{};1H".format(line + 1)
+
+
+class _Terminal:
+
+    def __init__(self, file):
+        self.file  = file
+        self.lines = None
+
+
+def make_terminal(file=None):
+    """
+        Return a new terminal writing its frames to the given file, or to the
+        standard output stream if no file is given.
+    """
+    return _Terminal(sys.stdout if file is None else file)
+
+
+def draw_frame(terminal, text):
+    """
+        Draw the given text as the next frame on the given terminal.
+        - The function returns the number of lines that were written.
+    """
+    lines = text.rstrip("\n").split("\n")
+    previous = terminal.lines
+    if previous is None or len(previous) != len(lines):
+        out = [_clear_screen, "\n".join(lines), "\n"]
+        nb_written = len(lines)
+    else:
+        out, nb_written = [], 0
+        for number, (line, previous_line) in enumerate(zip(lines, previous)):
+            if line != previous_line:
+                out.append(_move_to(number) + line + _erase_line)
+                nb_written += 1
+        out.append(_move_to(len(lines)))
+    terminal.lines = lines
+    terminal.file.write("".join(out))
+    terminal.file.flush()
+    return nb_written
+
+
+def forget_frame(terminal):
+    """
+        Make the next frame on the given terminal be written in full.
+    """
+    terminal.lines = None
@@ -0,0 +1,49 @@
+import Terminal
+import io
+import traceback
+
+
+# tests for drawing frames
+
+def test_draw_frame__First_Frame(score, max_score):
+    """Function draw_frame: the first frame clears the screen."""
+    max_score.value += 1
+    try:
+        out = io.StringIO()
+        terminal = Terminal.make_terminal(out)
+        assert Terminal.draw_frame(terminal, "ab\ncd\n") == 2
+        assert out.getvalue() == "\x1b[H\x1b[2Jab\ncd\n"
+        score.value += 1
+    except:
+        print(traceback.format_exc())
+
+
+def test_draw_frame__Changed_Lines(score, max_score):
+    """Function draw_frame: only changed lines are redrawn."""
+    max_score.value += 3
+    try:
+        out = io.StringIO()
+        terminal = Terminal.make_terminal(out)
+        Terminal.draw_frame(terminal, "ab\ncd\nef\n")
+        out.seek(0)
+        out.truncate()
+        assert Terminal.draw_frame(terminal, "ab\nXY\nef\n") == 1
+        assert out.getvalue() == "\x1b[2;1HXY\x1b[K\x1b[4;1H"
+        out.seek(0)
+        out.truncate()
+        assert Terminal.draw_frame(terminal, "ab\nXY\nef\n") == 0
+        assert out.getvalue() == "\x1b[4;1H"
+        # A frame with another number of lines is drawn in full.
+        assert Terminal.draw_frame(terminal, "ab\nXY\n") == 2
+        Terminal.forget_frame(terminal)
+        assert Terminal.draw_frame(terminal, "ab\nXY\n") == 2
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+terminal_test_functions = \
+    {
+        test_draw_frame__First_Frame,
+        test_draw_frame__Changed_Lines,
+    }
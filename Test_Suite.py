@@ -13,54 +13,254 @@ import Position_Test
 import Block_Test
 import Board_Test
 import Game_Test
+import Simulator_Test
+import Tournament_Test
+import Statistics_Test
+import Replay_Test
+import Corpus_Test
+import Dataset_Test
+import ExactCover_Test
+import Puzzle_Test
+import Terminal_Test
+import Benchmark_Test
+import GUI_Test
 
 import multiprocessing
+import os
+import queue
+import time
+import traceback
 
 
-def run_tests(test_functions):
+def _reset_peak_rss():
+    # Linux resets the peak resident set size of a process when 5 is written to
+    # its clear_refs file. Elsewhere, the peak of the worker so far is reported.
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
+
+
+def _get_peak_rss():
+    # Return the peak resident set size of this process in kilobytes.
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return None
+
+
+def _run_worker(tasks, results, score, max_score):
+    # Run the tests received one at a time on the given task queue, until None
+    # is received. The scores of the tests accumulate in the worker's own shared
+    # values, which are only read by the main process while the worker waits
+    # for its next test. The wall time and peak memory use of each test are sent
+    # along with the notice that it has finished.
+    while True:
+        test_function = tasks.get()
+        if test_function is None:
+            return
+        _reset_peak_rss()
+        start = time.perf_counter()
+        try:
+            test_function(score, max_score)
+        except:
+            print(traceback.format_exc())
+        results.put((os.getpid(), time.perf_counter() - start, _get_peak_rss()))
+
+
+class _Worker:
+
+    def __init__(self, results):
+        self.tasks = multiprocessing.Queue()
+        self.score = multiprocessing.Value("i", 0)
+        self.max_score = multiprocessing.Value("i", 0)
+        self.process = multiprocessing.Process \
+            (target=_run_worker, args=(self.tasks, results, self.score, self.max_score))
+        self.process.start()
+        self.test_function = None
+        self.deadline = None
+
+    def start(self, test_function, timeout):
+        self.old_score = self.score.value
+        self.old_max_score = self.max_score.value
+        self.test_function = test_function
+        self.start_time = time.monotonic()
+        self.deadline = self.start_time + timeout
+        self.tasks.put(test_function)
+
+    def finish(self, score, max_score, status, wall_time=None, peak_rss=None):
+        # Add the scores of the current test to the given totals, and return a
+        # record of the test. A test that did not obtain its maximum score is
+        # marked as failed, unless it has another status than passed.
+        gained = self.score.value - self.old_score
+        gained_max = self.max_score.value - self.old_max_score
+        score.value += gained
+        max_score.value += gained_max
+        if status == "passed" and gained != gained_max:
+            status = "failed"
+        test_function = self.test_function
+        self.test_function = None
+        return {
+            "name": test_function.__name__,
+            "module": test_function.__module__,
+            "doc": test_function.__doc__,
+            "status": status,
+            "score": gained,
+            "max_score": gained_max,
+            "time": time.monotonic() - self.start_time if wall_time is None else wall_time,
+            "peak_rss_kb": peak_rss,
+        }
+
+
+def run_tests(test_functions, workers=None, timeout=70, records=None):
+    """
+        Run the given test functions, and return a tuple of the score, the
+        maximum score and the list of descriptions of failed tests.
+        - If a list of records is given, a dictionary describing each test, with
+          its status, score, wall time in seconds and peak resident set size in
+          kilobytes, is appended to it in the order of the given tests.
+    """
     if __name__ == '__main__':
 
         max_score = multiprocessing.Value("i", 0)
         score = multiprocessing.Value("i", 0)
         failed_tests = []
 
-        for test_function in test_functions:
+        # Tests run concurrently on a pool of reusable worker processes. A
+        # worker that exceeds the timeout of its test, or that dies, is replaced,
+        # and its test is marked as timed out or as crashed.
+        test_functions = list(test_functions)
+        pending = list(reversed(test_functions))
+        results = multiprocessing.Queue()
+        pool = [_Worker(results)
+                for _ in range(min(workers or os.cpu_count() or 1, len(test_functions)))]
+        finished = {}
 
-            old_score = score.value
-            old_max_score = max_score.value
+        while pending or any(worker.test_function is not None for worker in pool):
+            for worker in pool:
+                if worker.test_function is None and pending:
+                    worker.start(pending.pop(), timeout)
 
-            # Start test as a process
-            test = multiprocessing.Process \
-                (target=test_function, name=test_function.__name__, args=(score, max_score))
-            test.start()
+            busy = [worker for worker in pool if worker.test_function is not None]
+            wait = max(min(worker.deadline for worker in busy) - time.monotonic(), 0)
+            try:
+                pid, wall_time, peak_rss = results.get(timeout=min(wait, 1))
+            except queue.Empty:
+                pid = None
 
-            # Terminate test
-            test.join(70)
+            for index, worker in enumerate(pool):
+                if worker.test_function is None:
+                    continue
+                test_function = worker.test_function
+                if worker.process.pid == pid:
+                    finished[test_function] = \
+                        worker.finish(score, max_score, "passed", wall_time, peak_rss)
+                elif not worker.process.is_alive() or time.monotonic() > worker.deadline:
+                    timed_out = worker.process.is_alive()
+                    worker.process.kill()
+                    worker.process.join()
+                    finished[test_function] = \
+                        worker.finish(score, max_score, "timed out" if timed_out else "crashed")
+                    pool[index] = _Worker(results)
 
-            if test.is_alive():
-                failed_tests.append("Timed out --> " + test_function.__doc__)
-            elif score.value - old_score != max_score.value - old_max_score:
-                failed_tests.append("Failed --> " + test_function.__doc__)
+        for worker in pool:
+            worker.tasks.put(None)
+        for worker in pool:
+            worker.process.join()
 
+        ordered = [finished[test_function] for test_function in test_functions]
+        if records is not None:
+            records.extend(ordered)
+        labels = {"timed out": "Timed out --> ", "crashed": "Crashed --> "}
+        failed_tests = [labels.get(record["status"], "Failed --> ") + record["doc"]
+                        for record in ordered if record["status"] != "passed"]
         return (score.value, max_score.value, failed_tests)
 
 
+def write_json_report(path, score, max_score, records):
+    import json
+    with open(path, "w") as file:
+        json.dump({"score": score, "max_score": max_score, "tests": records}, file, indent=2)
+
+
+def write_junit_report(path, records):
+    import xml.etree.ElementTree as ElementTree
+    suite = ElementTree.Element("testsuite", {
+        "name": "Test_Suite",
+        "tests": str(len(records)),
+        "failures": str(sum(record["status"] == "failed" for record in records)),
+        "errors": str(sum(record["status"] in ("timed out", "crashed") for record in records)),
+        "time": "{:.3f}".format(sum(record["time"] for record in records)),
+    })
+    for record in records:
+        case = ElementTree.SubElement(suite, "testcase", {
+            "classname": record["module"],
+            "name": record["name"],
+            "time": "{:.3f}".format(record["time"]),
+        })
+        if record["status"] == "failed":
+            ElementTree.SubElement(case, "failure", {
+                "message": "{} / {}: {}".format(record["score"], record["max_score"], record["doc"])})
+        elif record["status"] == "timed out":
+            ElementTree.SubElement(case, "error", {"message": "Timed out: " + record["doc"]})
+        elif record["status"] == "crashed":
+            ElementTree.SubElement(case, "error", {"message": "Crashed: " + record["doc"]})
+        if record["peak_rss_kb"] is not None:
+            properties = ElementTree.SubElement(case, "properties")
+            ElementTree.SubElement(properties, "property",
+                                   {"name": "peak_rss_kb", "value": str(record["peak_rss_kb"])})
+    ElementTree.ElementTree(suite).write(path, encoding="utf-8", xml_declaration=True)
+
+
 if __name__ == '__main__':
 
     modules = [
         Position_Test.position_test_functions,
         Block_Test.block_test_functions,
         Board_Test.board_test_functions,
-        Game_Test.game_test_functions
+        Game_Test.game_test_functions,
+        Simulator_Test.simulator_test_functions,
+        Tournament_Test.tournament_test_functions,
+        Statistics_Test.statistics_test_functions,
+        Replay_Test.replay_test_functions,
+        Corpus_Test.corpus_test_functions,
+        Dataset_Test.dataset_test_functions,
+        ExactCover_Test.exact_cover_test_functions,
+        Puzzle_Test.puzzle_test_functions,
+        Terminal_Test.terminal_test_functions,
+        Benchmark_Test.benchmark_test_functions,
+        GUI_Test.gui_test_functions
     ]
 
-    from sys import argv
-    if len(argv) > 1:
-        test_functions = modules[int(argv[1])]
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the tests.")
+    parser.add_argument("module", type=int, nargs="?",
+                        help="index of the only module to test")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument("--json", metavar="PATH",
+                        help="write the results of all tests in JSON to this file")
+    parser.add_argument("--junit", metavar="PATH",
+                        help="write the results of all tests in JUnit XML to this file")
+    parser.add_argument("--slowest", type=int, default=0, metavar="N",
+                        help="print the N slowest tests")
+    args = parser.parse_args()
+    if args.module is not None:
+        test_functions = modules[args.module]
     else:
         test_functions = set.union(*modules)
 
-    (score, max_score, failed_tests) = run_tests(test_functions)
+    records = []
+    (score, max_score, failed_tests) = run_tests(test_functions, args.jobs, records=records)
 
     print("Score: ", score, "/", max_score, end="")
     print(" (", score * 100 // max_score, "%)")
@@ -69,3 +269,16 @@ if __name__ == '__main__':
         print("Details")
         for failed_test in failed_tests:
             print("   ", failed_test)
+
+    if args.slowest > 0:
+        print()
+        print("Slowest tests")
+        for record in sorted(records, key=lambda record: -record["time"])[:args.slowest]:
+            rss = "?" if record["peak_rss_kb"] is None else record["peak_rss_kb"] // 1024
+            print("    {:8.3f} s {:>6} MB  {}.{}".format(
+                record["time"], rss, record["module"], record["name"]))
+
+    if args.json:
+        write_json_report(args.json, score, max_score, records)
+    if args.junit:
+        write_junit_report(args.junit, records)
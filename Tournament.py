@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+# Play many full games for each of a number of strategies in parallel worker
+# processes, and compare the strategies.
+# - Game g of each strategy is fed by the block source with the given seed and
+#   stream g, so that all strategies play the same sequences of blocks.
+# - Results are written to the results file as one JSON object per line, as
+#   soon as each game finishes.
+# - Strategies are named: a name in Game.strategies, "triplets" for
+#   Game.play_greedy on successive triplets of blocks, or "module:function" for
+#   an agent function in some module. An agent is called as
+#   agent(session, generator) with a Game.GameSession that is not over and a
+#   seeded random.Random, and returns the position at which to drop the current
+#   block of the session, like the strategies of Game.
+#   A game ends as soon as an agent returns a position at which the block
+#   cannot be dropped, with the result "illegal move" instead of "game over".
+
+import Block
+import Board
+import Game
+
+import importlib
+import json
+import multiprocessing
+import random
+import time
+
+
+def play_with_agent(agent, dimension, seed, game):
+    """
+        Play a full game with the given agent.
+        - The function returns a tuple of the final score, the number of moves
+          played and the result of the game: "game over", or "illegal move" if
+          the agent returned a position at which the block cannot be dropped.
+    """
+    session = Game.GameSession(dimension, seed, stream=game)
+    generator = random.Random("{}:{}".format(seed, game))
+    while not session.is_over():
+        if session.step(agent(session, generator)) is None:
+            return session.score, session.moves, "illegal move"
+    return session.score, session.moves, "game over"
+
+
+def play_greedy_game(dimension, seed, game):
+    """
+        Play a full game with Game.play_greedy, on successive triplets of blocks.
+        - The game ends at the first triplet for which play_greedy finds no
+          solution. None of the blocks of that triplet is counted as a move.
+        - The function returns a tuple of the final score, the number of moves
+          played and the result of the game, which is always "game over".
+    """
+    board = Board.make_board(dimension)
+    source = Block.make_block_source(seed, game)
+    score, moves = 0, 0
+    while True:
+        triplet = [Game.normalized_standard_blocks[index]
+                   for index in Block.draw_block_indices(source, 3)]
+        triplet_score = Game.play_greedy(board, triplet)
+        if triplet_score is None:
+            return score, moves, "game over"
+        score += triplet_score
+        moves += 3
+
+
+def load_agent(strategy):
+    """
+        Return the agent function named by the given strategy: a name in
+        Game.strategies or "module:function".
+    """
+    if strategy in Game.strategies:
+        return Game.strategies[strategy]
+    module_name, function_name = strategy.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def play_one(task):
+    """
+        Play the game described by the given (strategy, dimension, seed, game)
+        tuple, and return a dictionary with its result.
+    """
+    strategy, dimension, seed, game = task
+    start = time.perf_counter()
+    if strategy == "triplets":
+        score, moves, result = play_greedy_game(dimension, seed, game)
+    else:
+        score, moves, result = play_with_agent(load_agent(strategy), dimension, seed, game)
+    return {"strategy": strategy, "game": game, "seed": seed, "dimension": dimension,
+            "score": score, "moves": moves, "result": result,
+            "seconds": time.perf_counter() - start}
+
+
+def run_tournament(strategies, nb_games, dimension=5, seed=0, workers=None, results=None):
+    """
+        Play the given number of games for each of the given strategies, using a
+        pool of the given number of worker processes.
+        - Each result is written as a line of JSON to the given open text file,
+          if any, as soon as its game finishes.
+        - The function returns a dictionary mapping each strategy to a tuple of
+          its number of games, total score, total number of moves and total time
+          in seconds spent playing its games, followed by the wall time in
+          seconds of the whole tournament.
+    """
+    tasks = [(strategy, dimension, seed, game)
+             for game in range(nb_games) for strategy in strategies]
+    totals = {strategy: (0, 0, 0, 0.0) for strategy in strategies}
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(play_one, tasks):
+            if results is not None:
+                results.write(json.dumps(result) + "\n")
+                results.flush()
+            games, score, moves, seconds = totals[result["strategy"]]
+            totals[result["strategy"]] = \
+                (games + 1, score + result["score"], moves + result["moves"],
+                 seconds + result["seconds"])
+    return totals, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Play a tournament between strategies.")
+    parser.add_argument("strategies", nargs="*", default=["random", "greedy", "triplets"],
+                        help='{}, "triplets" or "module:function" (default: random greedy triplets)'.format(
+                            ", ".join('"{}"'.format(name) for name in sorted(Game.strategies))))
+    parser.add_argument("-n", "--games", type=int, default=100, help="games per strategy")
+    parser.add_argument("-d", "--dimension", type=int, default=5)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("-o", "--results", default=None, help="file to stream results to")
+    args = parser.parse_args()
+
+    results = open(args.results, "w") if args.results is not None else None
+    try:
+        totals, wall_time = run_tournament(
+            args.strategies, args.games, args.dimension, args.seed, args.workers, results)
+    finally:
+        if results is not None:
+            results.close()
+
+    all_games = sum(total[0] for total in totals.values())
+    all_moves = sum(total[2] for total in totals.values())
+    for strategy, (games, score, moves, seconds) in totals.items():
+        print("{:<24} games: {:6d}  mean score: {:9.2f}  mean moves: {:7.2f}  moves/s/core: {:9.0f}".format(
+            strategy, games, score / games if games else 0, moves / games if games else 0,
+            moves / seconds if seconds else 0))
+    if wall_time > 0:
+        print("Throughput: {:.1f} games/s, {:.0f} moves/s ({:.2f} s)".format(
+            all_games / wall_time, all_moves / wall_time, wall_time))
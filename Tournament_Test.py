@@ -0,0 +1,89 @@
+import Block
+import Game
+import Tournament
+import io
+import json
+import traceback
+
+
+# tests for the tournament runner
+
+def test_Play_One__Same_Blocks_For_All_Strategies(score, max_score):
+    """Function play_one: games are reproducible and strategies see the same blocks."""
+    max_score.value += 3
+    try:
+        for strategy in ("random", "greedy", "triplets", "Game:random_strategy"):
+            result = Tournament.play_one((strategy, 5, 9, 2))
+            assert result["moves"] >= 0
+            assert result["score"] >= result["moves"]
+            again = Tournament.play_one((strategy, 5, 9, 2))
+            assert (again["score"], again["moves"]) == (result["score"], result["moves"])
+        session = Game.GameSession(5, 9, stream=2)
+        indices = Block.draw_block_indices(Block.make_block_source(9, 2), 5)
+        for index in indices:
+            assert session.block_index == index
+            session.step(session.legal_moves()[0])
+        score.value += 3
+    except:
+        print(traceback.format_exc())
+
+
+def test_Play_One__Strategies_Of_Game(score, max_score):
+    """Function play_one: named strategies are those of Game.strategies."""
+    max_score.value += 2
+    try:
+        for name, strategy in Game.strategies.items():
+            if name == "lookahead":
+                continue
+            result = Tournament.play_one((name, 5, 4, 1))
+            assert (result["score"], result["moves"], result["result"]) == \
+                   Tournament.play_with_agent(strategy, 5, 4, 1)
+        assert Tournament.play_one(("triplets", 5, 4, 1))["moves"] % 3 == 0
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def test_Run_Tournament__Streams_Results(score, max_score):
+    """Function run_tournament: one result line per game and consistent totals."""
+    max_score.value += 2
+    try:
+        results = io.StringIO()
+        totals, wall_time = Tournament.run_tournament(["random", "greedy"], 3, 5, 1, 2, results)
+        lines = [json.loads(line) for line in results.getvalue().splitlines()]
+        assert len(lines) == 6
+        for strategy in ("random", "greedy"):
+            games = [line for line in lines if line["strategy"] == strategy]
+            assert sorted(line["game"] for line in games) == [0, 1, 2]
+            assert totals[strategy][:3] == \
+                   (3, sum(line["score"] for line in games), sum(line["moves"] for line in games))
+        assert wall_time > 0
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+def illegal_agent(session, generator):
+    return (0, 0)
+
+
+def test_Play_With_Agent__Illegal_Move(score, max_score):
+    """Function play_with_agent: the game ends at the first illegal move."""
+    max_score.value += 2
+    try:
+        assert Tournament.play_with_agent(illegal_agent, 5, 3, 0) == (0, 0, "illegal move")
+        result = Tournament.play_one(("Tournament_Test:illegal_agent", 5, 3, 0))
+        assert (result["score"], result["moves"], result["result"]) == (0, 0, "illegal move")
+        assert Tournament.play_one(("random", 5, 3, 0))["result"] == "game over"
+        score.value += 2
+    except:
+        print(traceback.format_exc())
+
+
+tournament_test_functions = \
+    {
+        test_Play_One__Same_Blocks_For_All_Strategies,
+        test_Play_One__Strategies_Of_Game,
+        test_Run_Tournament__Streams_Results,
+        test_Play_With_Agent__Illegal_Move,
+    }